@@ -1,16 +1,43 @@
 from __future__ import annotations
 
+import hashlib
+import os
+import re
+import stat
+import time
 from decimal import Decimal, InvalidOperation
+from urllib.parse import parse_qsl
 
-from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import PlainTextResponse, RedirectResponse
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse, RedirectResponse, Response
 
 from app.bot.handlers import notify_payment_confirmed
+from app.cache import TTLCache
 from app.runtime import AppContainer
 
 
+DEBUG_STORAGE_DIR = "/data"
+DEBUG_STORAGE_CACHE_TTL_SECONDS = 1.0
+ROBOKASSA_MAX_BODY_BYTES = 8192
+ROBOKASSA_MAX_QUERY_LENGTH = 4096
+INV_ID_PATTERN = re.compile(r"[0-9]{1,18}")
+PAYFAIL_ORDER_CACHE_SIZE = 1024
+PAYFAIL_ORDER_CACHE_TTL_SECONDS = 60.0
+PAYFAIL_UNKNOWN_INV_CACHE_SIZE = 4096
+PAYFAIL_UNKNOWN_INV_CACHE_TTL_SECONDS = 30.0
+HEALTH_OK_RESPONSE = Response(content=b'{"status":"ok"}', media_type="application/json")
+
+
+def _parse_form_pairs(raw: bytes) -> list[tuple[str, str]]:
+    return parse_qsl(raw.decode("utf-8", errors="replace"), keep_blank_values=True)
+
+
 def create_api(container: AppContainer, bot) -> FastAPI:
     app = FastAPI(title="RusBridgeBot API")
+    log_event = container.event_log.log_event
+    get_order_by_inv_id = container.repository.get_order_by_payment_inv_id
+    verify_signature = container.payment_service.verify_result_signature
+    handle_payment_webhook = container.order_flow.handle_successful_payment_webhook
 
     def _normalize_amount(value: str) -> str:
         try:
@@ -19,27 +46,79 @@ def create_api(container: AppContainer, bot) -> FastAPI:
             raise HTTPException(status_code=400, detail="invalid out_sum") from None
         return format(normalized, "f")
 
-    @app.get("/health")
-    async def health() -> dict[str, str]:
-        return {"status": "ok"}
+    def _parse_inv_id(value: str) -> int | None:
+        if INV_ID_PATTERN.fullmatch(value) is None:
+            return None
+        return int(value)
+
+    async def _read_limited_body(request: Request, limit: int) -> bytes:
+        content_length = request.headers.get("content-length")
+        if content_length is not None and (not content_length.isdigit() or int(content_length) > limit):
+            raise HTTPException(status_code=413, detail="payload too large")
+        body = bytearray()
+        async for chunk in request.stream():
+            body += chunk
+            if len(body) > limit:
+                raise HTTPException(status_code=413, detail="payload too large")
+        return bytes(body)
+
+    async def health(request: Request) -> Response:
+        return HEALTH_OK_RESPONSE
+
+    app.add_route("/health", health, methods=["GET"], include_in_schema=False)
 
     if container.settings.payment_mode == "robokassa":
-        @app.post("/payment/robokassa/result", response_class=PlainTextResponse)
-        async def robokassa_result(request: Request) -> PlainTextResponse:
-            form = await request.form()
-            data = {str(key): str(value) for key, value in form.items()}
-            if not container.payment_service.verify_result_signature(data):
-                container.repository.log_event("robokassa_invalid_signature", data)
+        bot_url = f"https://t.me/{container.settings.bot_username}"
+        payfail_url_prefix = bot_url + "?start=payfail_"
+        default_fail_redirect = RedirectResponse(url=bot_url, status_code=302)
+        payfail_order_ids: TTLCache[int, str] = TTLCache(
+            maxsize=PAYFAIL_ORDER_CACHE_SIZE,
+            ttl_seconds=PAYFAIL_ORDER_CACHE_TTL_SECONDS,
+        )
+        payfail_unknown_inv_ids: TTLCache[int, bool] = TTLCache(
+            maxsize=PAYFAIL_UNKNOWN_INV_CACHE_SIZE,
+            ttl_seconds=PAYFAIL_UNKNOWN_INV_CACHE_TTL_SECONDS,
+        )
+
+        @app.post(
+            "/payment/robokassa/result",
+            response_class=PlainTextResponse,
+            response_model=None,
+            include_in_schema=False,
+        )
+        async def robokassa_result(request: Request, background: BackgroundTasks) -> PlainTextResponse:
+            content_type = request.headers.get("content-type", "")
+            if content_type.startswith("multipart/"):
+                content_length = request.headers.get("content-length", "")
+                if not content_length.isdigit() or int(content_length) > ROBOKASSA_MAX_BODY_BYTES:
+                    raise HTTPException(status_code=413, detail="payload too large")
+                raw = await request.body()
+                form = await request.form()
+                pairs = [(str(key), str(value)) for key, value in form.multi_items()]
+            else:
+                raw = await _read_limited_body(request, ROBOKASSA_MAX_BODY_BYTES)
+                pairs = _parse_form_pairs(raw)
+            if not verify_signature(pairs):
+                log_event(
+                    "robokassa_invalid_signature",
+                    {
+                        "body_sha": hashlib.blake2b(raw, digest_size=16).hexdigest(),
+                        "size": len(raw),
+                        "keys": [key for key, _ in pairs[:16]],
+                    },
+                )
                 raise HTTPException(status_code=400, detail="invalid signature")
+            data = dict(pairs)
 
             inv_id_raw = data.get("InvId", "")
-            if not inv_id_raw.isdigit():
+            inv_id = _parse_inv_id(inv_id_raw)
+            if inv_id is None:
                 raise HTTPException(status_code=400, detail="invalid inv_id")
-            order = container.repository.get_order_by_payment_inv_id(int(inv_id_raw))
+            order = get_order_by_inv_id(inv_id)
             if order is not None:
                 shp_order_id = data.get("Shp_order_id", "")
                 if shp_order_id != order["order_id"]:
-                    container.repository.log_event(
+                    log_event(
                         "robokassa_shp_mismatch",
                         {
                             "inv_id": inv_id_raw,
@@ -49,10 +128,10 @@ def create_api(container: AppContainer, bot) -> FastAPI:
                     )
                     raise HTTPException(status_code=400, detail="invalid shp_order_id")
 
-                expected_out_sum = f"{int(order['price_rub']):.2f}"
+                expected_out_sum = f"{order['price_rub']:.2f}"
                 got_out_sum = _normalize_amount(data.get("OutSum", ""))
                 if got_out_sum != expected_out_sum:
-                    container.repository.log_event(
+                    log_event(
                         "robokassa_out_sum_mismatch",
                         {
                             "inv_id": inv_id_raw,
@@ -63,12 +142,12 @@ def create_api(container: AppContainer, bot) -> FastAPI:
                     )
                     raise HTTPException(status_code=400, detail="invalid out_sum")
 
-            result = container.order_flow.handle_successful_payment_webhook(
-                inv_id=int(inv_id_raw),
+            result = handle_payment_webhook(
+                inv_id=inv_id,
                 out_sum=data.get("OutSum", ""),
                 payment_status_text="webhook_paid",
             )
-            container.repository.log_event(
+            log_event(
                 "robokassa_result_webhook",
                 {
                     "updated": result.updated,
@@ -79,24 +158,29 @@ def create_api(container: AppContainer, bot) -> FastAPI:
             )
 
             if result.updated and result.order is not None:
-                await notify_payment_confirmed(container, bot, result.order)
+                background.add_task(notify_payment_confirmed, container, bot, result.order)
 
-            return PlainTextResponse(content=f"OK{inv_id_raw}")
+            return PlainTextResponse(content=b"OK" + str(inv_id).encode("ascii"))
 
-        @app.get("/payment/robokassa/fail")
+        @app.get("/payment/robokassa/fail", response_model=None, include_in_schema=False)
         async def robokassa_fail(request: Request) -> RedirectResponse:
+            if len(request.url.query) > ROBOKASSA_MAX_QUERY_LENGTH:
+                raise HTTPException(status_code=414, detail="query too long")
             params = {str(key): str(value) for key, value in request.query_params.items()}
             inv_id_raw = params.get("InvId", "")
-            redirect_to = f"https://t.me/{container.settings.bot_username}"
-            order_id = None
-
-            if inv_id_raw.isdigit():
-                order = container.repository.get_order_by_payment_inv_id(int(inv_id_raw))
-                if order is not None:
+            inv_id = _parse_inv_id(inv_id_raw)
+            if inv_id is None:
+                return default_fail_redirect
+
+            order_id = payfail_order_ids.get(inv_id)
+            if order_id is None and inv_id not in payfail_unknown_inv_ids:
+                order = get_order_by_inv_id(inv_id)
+                if order is None:
+                    payfail_unknown_inv_ids.set(inv_id, True)
+                else:
                     order_id = order["order_id"]
-                    redirect_to = f"https://t.me/{container.settings.bot_username}?start=payfail_{order_id}"
-
-            container.repository.log_event(
+                    payfail_order_ids.set(inv_id, order_id)
+            log_event(
                 "robokassa_fail_redirect",
                 {
                     "inv_id": inv_id_raw,
@@ -104,27 +188,41 @@ def create_api(container: AppContainer, bot) -> FastAPI:
                     "params": params,
                 },
             )
-            return RedirectResponse(url=redirect_to, status_code=302)
+            if order_id is None:
+                return default_fail_redirect
+            return RedirectResponse(url=payfail_url_prefix + order_id, status_code=302)
 
     if container.settings.debug_storage_enabled:
-        @app.get("/debug/storage")
-        async def debug_storage() -> dict:
-            import os
+        storage_cache: tuple[int, float, dict] | None = None
 
-            storage_dir = "/data"
-            if not os.path.isdir(storage_dir):
+        @app.get("/debug/storage", response_model=None, include_in_schema=False)
+        async def debug_storage() -> dict:
+            nonlocal storage_cache
+            storage_dir = DEBUG_STORAGE_DIR
+            try:
+                dir_stat = os.stat(storage_dir)
+            except OSError:
+                dir_stat = None
+            if dir_stat is None or not stat.S_ISDIR(dir_stat.st_mode):
                 return {"error": f"{storage_dir} is not mounted or does not exist", "files": []}
 
+            now = time.monotonic()
+            if storage_cache is not None:
+                cached_mtime_ns, cached_at, cached_payload = storage_cache
+                if cached_mtime_ns == dir_stat.st_mtime_ns and now - cached_at < DEBUG_STORAGE_CACHE_TTL_SECONDS:
+                    return cached_payload
+
+            with os.scandir(storage_dir) as it:
+                entries = sorted((entry for entry in it if entry.is_file()), key=lambda entry: entry.name)
             files = []
             total_size = 0
-            for file_name in sorted(os.listdir(storage_dir)):
-                path = os.path.join(storage_dir, file_name)
-                if not os.path.isfile(path):
-                    continue
-                size = os.path.getsize(path)
+            for entry in entries:
+                size = entry.stat().st_size
                 total_size += size
-                files.append({"file": file_name, "size_bytes": size})
+                files.append({"file": entry.name, "size_bytes": size})
 
-            return {"files": files, "total_size_bytes": total_size}
+            payload = {"files": files, "total_size_bytes": total_size}
+            storage_cache = (dir_stat.st_mtime_ns, now, payload)
+            return payload
 
     return app
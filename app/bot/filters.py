@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from typing import Any, Awaitable, Callable, Mapping
+
+from aiogram.filters import Filter
+from aiogram.types import CallbackQuery
+
+
+CallbackHandler = Callable[[CallbackQuery, str], Awaitable[None]]
+
+
+class CallbackPrefix(Filter):
+    def __init__(self, handlers: Mapping[str, CallbackHandler]):
+        self.handlers = handlers
+
+    async def __call__(self, callback: CallbackQuery) -> bool | dict[str, Any]:
+        prefix, separator, arg = (callback.data or "").partition(":")
+        if not separator:
+            return False
+        handler = self.handlers.get(prefix)
+        if handler is None:
+            return False
+        return {"callback_handler": handler, "callback_arg": arg}
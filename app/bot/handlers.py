@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import asyncio
+import math
+import re
 import time
 from datetime import date, timedelta
 from pathlib import Path
@@ -7,8 +10,9 @@ from typing import Any
 
 from aiogram import Bot, F, Router
 from aiogram.filters import Command, CommandStart
-from aiogram.types import CallbackQuery, FSInputFile, LinkPreviewOptions, Message
+from aiogram.types import BufferedInputFile, CallbackQuery, LinkPreviewOptions, Message
 
+from app.bot.filters import CallbackHandler, CallbackPrefix
 from app.bot.keyboards import (
     admin_payment_proof_keyboard,
     admin_order_keyboard,
@@ -18,28 +22,35 @@ from app.bot.keyboards import (
     manual_payment_retry_keyboard,
     payment_keyboard,
     payment_retry_keyboard,
-    payment_test_confirm_keyboard,
-    payment_test_fail_keyboard,
+    payment_test_keyboard,
     provider_picker_keyboard,
     product_picker_keyboard,
     renew_keyboard,
 )
 from app.bot.texts import (
+    admin_client_confirmed,
+    admin_client_issue,
     admin_link_received,
     admin_new_lead,
+    admin_operator_request,
+    admin_order_cancelled,
     admin_paid,
+    active_product_order_text,
     ask_service_link_text,
+    daily_order_limit_text,
     invalid_service_link_text,
     manual_payment_details_text,
-    order_wait_pay_text,
+    open_order_text,
+    order_created_text,
     product_confirmation_text,
 )
+from app.cache import TTLCache
 from app.enums import OrderStatus
-from app.products import PROVIDER_TITLES
-from app.repository import UserHasOpenOrderError
+from app.products import PROVIDER_TITLES, Product, group_visible_products
+from app.repository import ACTIVE_STATUS_VALUES, UserHasOpenOrderError
 from app.runtime import AppContainer
 from app.services.link_validator import validate_service_link
-from app.services.order_flow import DailyOrderLimitExceededError
+from app.services.order_flow import CreateOrderResult, DailyOrderLimitExceededError
 
 
 PRODUCT_ALIASES = {
@@ -57,14 +68,27 @@ OPENROUTER_CODE = "openrouter"
 NANO_BANANA_CODE = "nano_banana"
 VARIABLE_PRICE_MARKUP = 1.3
 VARIABLE_PRICE_RUB_RATE = 80
-VARIABLE_PRICE_PRODUCT_CODES = {OPENROUTER_CODE, NANO_BANANA_CODE}
-CLAUDE_CHECKOUT_ALLOWED_DOMAINS = [
+VARIABLE_PRICE_PRODUCT_CODES = frozenset({OPENROUTER_CODE, NANO_BANANA_CODE})
+VARIABLE_PRICE_RUB_BY_USD = {
+    usd_amount: int(usd_amount * VARIABLE_PRICE_MARKUP * VARIABLE_PRICE_RUB_RATE) for usd_amount in range(1, 201)
+}
+CLAUDE_CHECKOUT_ALLOWED_DOMAINS = frozenset({
     "claude.ai",
     "anthropic.com",
     "billing.stripe.com",
     "checkout.stripe.com",
-]
+})
 NANO_GUIDE_PATH = Path("data/Nano.jpg")
+NANO_HINT_TEXT = (
+    "Для Nano Banana:\n"
+    "Зайдите на любой из сайтов:\n"
+    "https://nanobanana.im/\n"
+    "https://nanobanapro.com/\n"
+    "https://www.nano-banana.ai/\n"
+    "https://nano-banana.io/\n"
+    "или аналогичный сайт Nano Banana.\n\n"
+    "Выберите подписку или разовый пакет, затем введите сумму в долларах."
+)
 DEFAULT_POST_PAYMENT_GUIDE_PATH = Path("data/GPT.jpg")
 POST_PAYMENT_PROVIDER_GUIDE_BY_PROVIDER: dict[str, Path] = {
     "gpt": Path("data/GPT.jpg"),
@@ -72,27 +96,135 @@ POST_PAYMENT_PROVIDER_GUIDE_BY_PROVIDER: dict[str, Path] = {
     "cursor": Path("data/Cursore.jpg"),
     "copilot": Path("data/Copilot.jpg"),
 }
+OPERATOR_QUESTION_PREFIX_PATTERN = re.compile(r"(?:мод|mod):", re.IGNORECASE)
+POST_PAYMENT_GUIDE_PATHS: dict[str, Path | None] = {}
+GUIDE_PHOTOS: dict[Path, BufferedInputFile | str] = {}
 SUPPORT_HINT = "Если нужна помощь, напишите: МОД: ваш вопрос"
+CHOOSE_PROVIDER_TEXT = "Что оформить?\n\n" + SUPPORT_HINT
+CHOOSE_SUBSCRIPTION_TEXT = "Выберите подписку:\n\n" + SUPPORT_HINT
+NO_ORDER_CONTEXT_TEXT = (
+    "Чтобы начать оформление, используйте /start или ссылку оффера.\n"
+    "Команды: /help\n"
+    + SUPPORT_HINT
+)
+HELP_MESSAGE: dict[str, Any] = {
+    "text": (
+        "Я помогу оформить подписку.\n"
+        "1) Выберите продукт\n"
+        "2) Оплатите счёт\n"
+        "3) Пришлите ссылку оплаты сервиса\n\n"
+        "Команды:\n"
+        "/status [order_id] - статус заказа\n"
+        "/cancel <order_id> - отмена заказа (если доступно)\n"
+        "/operator - позвать оператора\n"
+        "Или напишите: МОД: ваш вопрос"
+    ),
+    "disable_notification": True,
+}
+OPERATOR_REQUEST_SENT_MESSAGE: dict[str, Any] = {
+    "text": "Оператору отправлен запрос. Ожидайте ответ в этом чате.",
+    "disable_notification": True,
+}
+PAYMENT_RETRY_CLIENT_TEXT = (
+    "Не удалось подтвердить оплату по скриншоту.\n"
+    "Проверьте перевод и пришлите новый скриншот."
+)
+ORDER_DONE_CLIENT_TEXT = (
+    "Готово ✅ Проверьте, что подписка активна.\n"
+    "Нажмите одну кнопку ниже:"
+)
+ORDER_ERROR_CLIENT_TEXT = (
+    "Не получилось завершить заказ.\n"
+    "Оператор уже разбирается и свяжется с вами."
+)
+SERVICE_LINK_TEXTS: dict[str, str] = {}
+RENEW_REMINDER_TEXTS: dict[tuple[str, int], str] = {}
+NO_LINK_PREVIEW = LinkPreviewOptions(is_disabled=True)
 USER_BLOCKED_TEXT = "Доступ к боту временно ограничен. Обратитесь к оператору."
+STATUS_WAIT_PAY = OrderStatus.WAIT_PAY.value
+STATUS_WAIT_SERVICE_LINK = OrderStatus.WAIT_SERVICE_LINK.value
+STATUS_READY_FOR_OPERATOR = OrderStatus.READY_FOR_OPERATOR.value
+STATUS_IN_PROGRESS = OrderStatus.IN_PROGRESS.value
+STATUS_WAIT_CLIENT_CONFIRM = OrderStatus.WAIT_CLIENT_CONFIRM.value
+STATUS_CANCELLED = OrderStatus.CANCELLED.value
+PENDING_INPUT_MAX_USERS = 10_000
+PENDING_INPUT_TTL_SECONDS = 15 * 60
+CALLBACK_TAP_WINDOW_SECONDS = 2.0
+CALLBACK_TAP_MAX_KEYS = 10_000
+COALESCED_CALLBACK_PREFIXES = frozenset({"check", "cancel", "client_ok", "client_fail", "test_paid"})
+USER_TOUCH_INTERVAL_SECONDS = 5 * 60
+WAITING_INPUT_STATUSES = (STATUS_WAIT_PAY, STATUS_WAIT_SERVICE_LINK)
+WAITING_INPUT_ORDERS_LIMIT = 3
+
+
+ORDER_STATUS_HINTS = {
+    STATUS_WAIT_PAY: "ждём подтверждение оплаты",
+    STATUS_WAIT_SERVICE_LINK: "пришлите ссылку оплаты сервиса",
+    STATUS_READY_FOR_OPERATOR: "заказ уже в очереди оператора",
+    STATUS_IN_PROGRESS: "оператор уже работает над заказом",
+    STATUS_WAIT_CLIENT_CONFIRM: "осталось подтвердить, что всё активно",
+}
 
 
 def _order_status_hint(status: str) -> str:
-    hints = {
-        OrderStatus.WAIT_PAY.value: "ждём подтверждение оплаты",
-        OrderStatus.WAIT_SERVICE_LINK.value: "пришлите ссылку оплаты сервиса",
-        OrderStatus.READY_FOR_OPERATOR.value: "заказ уже в очереди оператора",
-        OrderStatus.IN_PROGRESS.value: "оператор уже работает над заказом",
-        OrderStatus.WAIT_CLIENT_CONFIRM.value: "осталось подтвердить, что всё активно",
-    }
-    return hints.get(status, status)
+    return ORDER_STATUS_HINTS.get(status, status)
+
+
+def _command_args(text: str | None, max_args: int) -> list[str]:
+    return (text or "").strip().split(maxsplit=max_args)[1:]
 
 
 def build_router(container: AppContainer, bot: Bot) -> Router:
     router = Router()
-    pending_variable_price_input: dict[int, str] = {}
-    pending_claude_checkout_input: dict[int, str] = {}
-    claude_precheck_passed: dict[int, str] = {}
-    operator_last_request_at: dict[int, float] = {}
+    products = container.products
+    repository = container.repository
+    order_flow = container.order_flow
+    settings = container.settings
+    log_admin_action = container.admin_log.log_admin_action
+    submit_outbox = container.outbox.submit
+    submit_outbox_for = container.outbox.submit_for
+    pending_variable_price_input: TTLCache[int, str] = TTLCache(
+        maxsize=PENDING_INPUT_MAX_USERS,
+        ttl_seconds=PENDING_INPUT_TTL_SECONDS,
+    )
+    recent_callback_taps: TTLCache[tuple[int, str], bool] = TTLCache(
+        maxsize=CALLBACK_TAP_MAX_KEYS,
+        ttl_seconds=CALLBACK_TAP_WINDOW_SECONDS,
+    )
+    recent_user_touches: TTLCache[tuple[int, str | None], bool] = TTLCache(
+        maxsize=PENDING_INPUT_MAX_USERS,
+        ttl_seconds=USER_TOUCH_INTERVAL_SECONDS,
+    )
+    pending_claude_checkout_input: TTLCache[int, str] = TTLCache(
+        maxsize=PENDING_INPUT_MAX_USERS,
+        ttl_seconds=PENDING_INPUT_TTL_SECONDS,
+    )
+    claude_precheck_passed: TTLCache[int, str] = TTLCache(
+        maxsize=PENDING_INPUT_MAX_USERS,
+        ttl_seconds=PENDING_INPUT_TTL_SECONDS,
+    )
+    operator_last_request_at: TTLCache[int, float] = TTLCache(
+        maxsize=PENDING_INPUT_MAX_USERS,
+        ttl_seconds=max(0, int(settings.operator_cooldown_seconds)),
+    )
+    end_dates_by_product: dict[str, str] = {}
+    end_dates_day: date | None = None
+    products_by_code = products | {
+        alias: products[target] for alias, target in PRODUCT_ALIASES.items() if target in products
+    }
+    visible_products = group_visible_products(products)
+    provider_keyboard = provider_picker_keyboard(visible_products)
+    product_keyboards = {
+        provider: product_picker_keyboard(provider_products, include_back=True)
+        for provider, provider_products in visible_products.items()
+    }
+    confirm_keyboards = {code: confirm_product_keyboard(code) for code in products}
+    confirmation_texts = {code: product_confirmation_text(product) for code, product in products.items()}
+    for provider in {product.provider for product in products.values()}:
+        _preload_post_payment_guide(provider)
+    nano_guide_available = NANO_GUIDE_PATH.exists()
+    if nano_guide_available:
+        _preload_guide_photo(NANO_GUIDE_PATH)
 
     def clear_pending_inputs(tg_id: int) -> None:
         pending_variable_price_input.pop(tg_id, None)
@@ -100,7 +232,9 @@ def build_router(container: AppContainer, bot: Bot) -> Router:
         claude_precheck_passed.pop(tg_id, None)
 
     async def ensure_not_blocked_message(message: Message) -> bool:
-        block = container.repository.get_user_block(message.from_user.id)
+        if message.chat.id == settings.admin_chat_id:
+            return True
+        block = await asyncio.to_thread(repository.get_user_block, message.from_user.id)
         if block is None:
             return True
         reason = (block.get("reason") or "").strip()
@@ -109,7 +243,9 @@ def build_router(container: AppContainer, bot: Bot) -> Router:
         return False
 
     async def ensure_not_blocked_callback(callback: CallbackQuery) -> bool:
-        block = container.repository.get_user_block(callback.from_user.id)
+        if callback.message is not None and callback.message.chat.id == settings.admin_chat_id:
+            return True
+        block = await asyncio.to_thread(repository.get_user_block, callback.from_user.id)
         if block is None:
             return True
         reason = (block.get("reason") or "").strip()
@@ -120,52 +256,54 @@ def build_router(container: AppContainer, bot: Bot) -> Router:
         return False
 
     def operator_request_cooldown_left(tg_id: int) -> int:
-        cooldown = max(0, int(container.settings.operator_cooldown_seconds))
+        cooldown = max(0, int(settings.operator_cooldown_seconds))
         if cooldown <= 0:
             return 0
         last = operator_last_request_at.get(tg_id)
         if last is None:
             return 0
-        passed = int(time.time() - last)
-        left = cooldown - passed
-        return left if left > 0 else 0
+        left = cooldown - (time.monotonic() - last)
+        return math.ceil(left) if left > 0 else 0
 
     def mark_operator_request(tg_id: int) -> None:
-        operator_last_request_at[tg_id] = time.time()
+        operator_last_request_at.set(tg_id, time.monotonic())
+
+    def subscription_end_date(product_code: str, duration_days: int) -> str:
+        nonlocal end_dates_day
+        today = date.today()
+        if today != end_dates_day:
+            end_dates_by_product.clear()
+            end_dates_day = today
+        end_date = end_dates_by_product.get(product_code)
+        if end_date is None:
+            end_date = (today + timedelta(days=duration_days)).isoformat()
+            end_dates_by_product[product_code] = end_date
+        return end_date
 
     def format_open_order_message(exc: UserHasOpenOrderError) -> str:
-        return (
-            "У вас уже есть незакрытый заказ.\n"
-            f"Order ID: {exc.existing_order_id}\n"
-            f"Статус: {exc.existing_status}\n\n"
-            "Новый заказ можно создать после закрытия текущего.\n"
-            "Проверьте статус: /status " + exc.existing_order_id + "\n"
-            "Если нужна помощь: /operator"
+        return open_order_text(
+            exc.existing_order_id,
+            exc.existing_status,
+            _order_status_hint(exc.existing_status),
         )
 
     def _variable_price_rub(usd_amount: int) -> int:
-        return int(usd_amount * VARIABLE_PRICE_MARKUP * VARIABLE_PRICE_RUB_RATE)
+        price_rub = VARIABLE_PRICE_RUB_BY_USD.get(usd_amount)
+        if price_rub is None:
+            price_rub = int(usd_amount * VARIABLE_PRICE_MARKUP * VARIABLE_PRICE_RUB_RATE)
+        return price_rub
 
     async def ask_variable_amount(message: Message, product_code: str, *, tg_id: int | None = None) -> None:
         owner_tg_id = tg_id if tg_id is not None else message.from_user.id
         pending_claude_checkout_input.pop(owner_tg_id, None)
         claude_precheck_passed.pop(owner_tg_id, None)
-        pending_variable_price_input[owner_tg_id] = product_code
+        pending_variable_price_input.set(owner_tg_id, product_code)
         if product_code == NANO_BANANA_CODE:
-            nano_hint = (
-                "Для Nano Banana:\n"
-                "Зайдите на любой из сайтов:\n"
-                "https://nanobanana.im/\n"
-                "https://nanobanapro.com/\n"
-                "https://www.nano-banana.ai/\n"
-                "https://nano-banana.io/\n"
-                "или аналогичный сайт Nano Banana.\n\n"
-                "Выберите подписку или разовый пакет, затем введите сумму в долларах."
-            )
-            if NANO_GUIDE_PATH.exists():
-                await message.answer_photo(photo=FSInputFile(str(NANO_GUIDE_PATH)), caption=nano_hint)
+            if nano_guide_available:
+                sent = await message.answer_photo(photo=_guide_photo(NANO_GUIDE_PATH), caption=NANO_HINT_TEXT)
+                _remember_guide_file_id(NANO_GUIDE_PATH, sent)
             else:
-                await message.answer(nano_hint)
+                await message.answer(NANO_HINT_TEXT)
         await message.answer(
             "Сколько долларов положить?\n"
             "Введите целое число в USD (например: 10)."
@@ -174,7 +312,7 @@ def build_router(container: AppContainer, bot: Bot) -> Router:
     async def ask_claude_checkout_precheck(message: Message, product_code: str, *, tg_id: int | None = None) -> None:
         owner_tg_id = tg_id if tg_id is not None else message.from_user.id
         pending_variable_price_input.pop(owner_tg_id, None)
-        pending_claude_checkout_input[owner_tg_id] = product_code
+        pending_claude_checkout_input.set(owner_tg_id, product_code)
         claude_precheck_passed.pop(owner_tg_id, None)
         await message.answer(
             "🟣 Claude Pro/Max: проверка перед оплатой\n"
@@ -190,34 +328,36 @@ def build_router(container: AppContainer, bot: Bot) -> Router:
     async def send_provider_menu(message: Message, *, text: str = "Что оформить?") -> None:
         await message.answer(
             text,
-            reply_markup=provider_picker_keyboard(container.products),
+            reply_markup=provider_keyboard,
         )
 
     async def send_admin(text: str, *, reply_markup: Any | None = None) -> None:
         await bot.send_message(
-            chat_id=container.settings.admin_chat_id,
+            chat_id=settings.admin_chat_id,
             text=text,
             reply_markup=reply_markup,
-            link_preview_options=LinkPreviewOptions(is_disabled=True),
+            link_preview_options=NO_LINK_PREVIEW,
         )
 
-    def resolve_target_tg_id(target: str) -> int | None:
-        if target.upper().startswith("RB-"):
-            order = container.repository.get_order(target)
+    async def resolve_target_tg_id(target: str) -> int | None:
+        if target[:3].upper() == "RB-":
+            order = await asyncio.to_thread(repository.get_order, target)
             if order is None:
                 return None
-            return int(order["tg_id"])
+            return order["tg_id"]
         try:
             return int(target)
         except ValueError:
             return None
 
     def is_manual_payment_mode() -> bool:
-        return container.settings.payment_mode == "manual"
+        return settings.payment_mode == "manual"
 
     def payment_primary_keyboard(order: dict[str, Any], pay_url: str) -> Any:
         if is_manual_payment_mode():
             return manual_payment_keyboard(order["order_id"])
+        if settings.payment_test_mode:
+            return payment_test_keyboard(pay_url, order["order_id"])
         return payment_keyboard(pay_url)
 
     def payment_retry_controls(order: dict[str, Any], pay_url: str) -> Any:
@@ -225,58 +365,52 @@ def build_router(container: AppContainer, bot: Bot) -> Router:
             return manual_payment_retry_keyboard(order["order_id"])
         return payment_retry_keyboard(pay_url, order["order_id"])
 
-    async def send_wait_pay_messages(message: Message, order: dict[str, Any], payment_url: str) -> None:
-        product = container.products[order["product_code"]]
-        await message.answer(
-            order_wait_pay_text(
-                product,
-                order["order_id"],
-                container.settings.payment_mode,
-                container.settings.payment_test_mode,
-                price_rub=int(order["price_rub"]),
-            ),
-            reply_markup=payment_primary_keyboard(order, payment_url),
+    async def send_wait_pay_messages(
+        message: Message,
+        order: dict[str, Any],
+        payment_url: str,
+        *,
+        reason: str | None = None,
+    ) -> None:
+        product = products[order["product_code"]]
+        text = order_created_text(
+            product,
+            order["order_id"],
+            settings.payment_mode,
+            settings.payment_test_mode,
+            price_rub=order["price_rub"],
         )
         await message.answer(
-            f"Заказ {order['order_id']} отслеживается автоматически.\n"
-            "Если нужно, проверьте вручную: /status " + order["order_id"]
-        )
-        await message.answer(
-            "Если хотите отменить до подтверждения оплаты: /cancel " + order["order_id"]
+            f"{reason}\n\n{text}" if reason else text,
+            reply_markup=payment_primary_keyboard(order, payment_url),
         )
-        if is_manual_payment_mode():
-            await message.answer("После оплаты пришлите скриншот в этот чат.")
-            return
-        if container.settings.payment_test_mode:
-            await message.answer(
-                "Тестовый шаг: подтвердите успешную оплату.",
-                reply_markup=payment_test_confirm_keyboard(order["order_id"]),
-            )
-            await message.answer(
-                "Тестовый шаг: сценарий неуспешной оплаты.",
-                reply_markup=payment_test_fail_keyboard(order["order_id"]),
-            )
 
     async def send_wait_pay_resume(message: Message, order: dict[str, Any], *, reason: str | None = None) -> None:
-        payment = container.order_flow.get_payment_link_for_order(order)
-        if reason:
-            await message.answer(reason)
-        await send_wait_pay_messages(message, order, payment.pay_url)
+        payment = await asyncio.to_thread(order_flow.get_payment_link_for_order, order)
+        await send_wait_pay_messages(message, order, payment.pay_url, reason=reason)
         await message.answer(
             "Если оплата не прошла, можно повторить или отменить заказ:",
             reply_markup=payment_retry_controls(order, payment.pay_url),
         )
 
+    async def send_order_created(message: Message, result: CreateOrderResult, *, source_label: str) -> None:
+        if not result.reused_active_order:
+            submit_outbox_for(
+                settings.admin_chat_id,
+                send_admin,
+                admin_new_lead(result.order, source_label=source_label),
+            )
+        await send_wait_pay_messages(message, result.order, result.payment.pay_url)
+
     @router.message(CommandStart())
     async def handle_start(message: Message) -> None:
         if not await ensure_not_blocked_message(message):
             return
-        payload = None
-        if message.text and " " in message.text:
-            payload = message.text.split(" ", 1)[1].strip()
-        normalized_payload = PRODUCT_ALIASES.get(payload, payload) if payload else None
+        _, separator, raw_payload = (message.text or "").partition(" ")
+        payload = raw_payload.strip() if separator else None
 
-        container.repository.upsert_user(
+        await asyncio.to_thread(
+            repository.upsert_user,
             tg_id=message.from_user.id,
             username=message.from_user.username,
             source_key=payload,
@@ -284,11 +418,11 @@ def build_router(container: AppContainer, bot: Bot) -> Router:
 
         if payload and payload.startswith("payfail_"):
             order_id = payload.removeprefix("payfail_")
-            order = container.repository.get_order(order_id)
-            if order is None or int(order["tg_id"]) != message.from_user.id:
+            order = await asyncio.to_thread(repository.get_order, order_id)
+            if order is None or order["tg_id"] != message.from_user.id:
                 await message.answer("Заказ не найден. Используйте /start для нового оформления.")
                 return
-            if order["status"] == OrderStatus.WAIT_PAY.value:
+            if order["status"] == STATUS_WAIT_PAY:
                 await send_wait_pay_resume(
                     message,
                     order,
@@ -302,8 +436,8 @@ def build_router(container: AppContainer, bot: Bot) -> Router:
             )
             return
 
-        if normalized_payload and normalized_payload in container.products:
-            product = container.products[normalized_payload]
+        product = products_by_code.get(payload) if payload else None
+        if product is not None:
             if product.code in VARIABLE_PRICE_PRODUCT_CODES:
                 await ask_variable_amount(message, product.code)
                 return
@@ -312,63 +446,53 @@ def build_router(container: AppContainer, bot: Bot) -> Router:
                 return
             clear_pending_inputs(message.from_user.id)
             await message.answer(
-                product_confirmation_text(product),
-                reply_markup=confirm_product_keyboard(product.code),
+                confirmation_texts[product.code],
+                reply_markup=confirm_keyboards[product.code],
             )
             return
 
-        if payload and normalized_payload not in container.products:
+        if payload:
             await message.answer(
                 "Ключ оффера не найден. Выберите подписку из списка:",
-                reply_markup=provider_picker_keyboard(container.products),
+                reply_markup=provider_keyboard,
             )
             return
 
-        wait_pay_orders = container.repository.list_orders_by_user_and_statuses(
+        active_orders = await asyncio.to_thread(
+            repository.list_orders_by_user_and_statuses,
             tg_id=message.from_user.id,
-            statuses=[OrderStatus.WAIT_PAY.value],
+            statuses=ACTIVE_STATUS_VALUES,
         )
-        if wait_pay_orders:
+        wait_pay_order = next((order for order in active_orders if order["status"] == STATUS_WAIT_PAY), None)
+        if wait_pay_order is not None:
             await send_wait_pay_resume(
                 message,
-                wait_pay_orders[0],
+                wait_pay_order,
                 reason="У вас есть незавершённая оплата. Продолжим её?",
             )
             return
 
-        active_order = container.repository.find_active_order_any(message.from_user.id)
-        if active_order is not None:
+        if active_orders:
+            active_order = active_orders[0]
             await message.answer(
-                "У вас уже есть незакрытый заказ.\n"
-                f"Order ID: {active_order['order_id']}\n"
-                f"Статус: {active_order['status']}\n"
-                f"Комментарий: {_order_status_hint(active_order['status'])}\n\n"
-                "Проверьте статус: /status " + active_order["order_id"] + "\n"
-                "Если нужна помощь: /operator"
+                open_order_text(
+                    active_order["order_id"],
+                    active_order["status"],
+                    _order_status_hint(active_order["status"]),
+                )
             )
             return
 
         await message.answer(
-            "Что оформить?\n\n"
-            + SUPPORT_HINT,
-            reply_markup=provider_picker_keyboard(container.products),
+            CHOOSE_PROVIDER_TEXT,
+            reply_markup=provider_keyboard,
         )
 
     @router.message(Command("help"))
     async def handle_help(message: Message) -> None:
         if not await ensure_not_blocked_message(message):
             return
-        await message.answer(
-            "Я помогу оформить подписку.\n"
-            "1) Выберите продукт\n"
-            "2) Оплатите счёт\n"
-            "3) Пришлите ссылку оплаты сервиса\n\n"
-            "Команды:\n"
-            "/status [order_id] - статус заказа\n"
-            "/cancel <order_id> - отмена заказа (если доступно)\n"
-            "/operator - позвать оператора\n"
-            "Или напишите: МОД: ваш вопрос"
-        )
+        await message.answer(**HELP_MESSAGE)
 
     @router.message(Command("operator"))
     async def handle_operator(message: Message) -> None:
@@ -379,30 +503,24 @@ def build_router(container: AppContainer, bot: Bot) -> Router:
             await message.answer(f"Подождите {cooldown_left} сек. перед следующим запросом оператору.")
             return
         mark_operator_request(message.from_user.id)
-        await message.answer("Оператору отправлен запрос. Ожидайте ответ в этом чате.")
-        await send_admin(
-            "CLIENT NEEDS OPERATOR\n"
-            f"Пользователь: @{message.from_user.username or 'без_username'} "
-            f"(id: {message.from_user.id})"
+        await asyncio.gather(
+            message.answer(**OPERATOR_REQUEST_SENT_MESSAGE),
+            send_admin(admin_operator_request(message.from_user.username, message.from_user.id)),
         )
 
     @router.message(Command("msg"))
     async def admin_send_message(message: Message) -> None:
-        if message.chat.id != container.settings.admin_chat_id:
+        if message.chat.id != settings.admin_chat_id:
             await message.answer("Команда доступна только в админ-чате.")
             return
-        if not message.text:
+        args = _command_args(message.text, 2)
+        if len(args) < 2:
             await message.answer("Формат: /msg <tg_id|order_id> <текст>")
             return
 
-        parts = message.text.split(" ", 2)
-        if len(parts) < 3 or not parts[1].strip() or not parts[2].strip():
-            await message.answer("Формат: /msg <tg_id|order_id> <текст>")
-            return
+        target, text_to_client = args
 
-        target = parts[1].strip()
-        text_to_client = parts[2].strip()
-        target_tg_id = resolve_target_tg_id(target)
+        target_tg_id = await resolve_target_tg_id(target)
         if target_tg_id is None:
             await message.answer("Укажите корректный tg_id или Order ID (RB-...).")
             return
@@ -415,23 +533,21 @@ def build_router(container: AppContainer, bot: Bot) -> Router:
 
     @router.message(Command("block"))
     async def admin_block_user(message: Message) -> None:
-        if message.chat.id != container.settings.admin_chat_id:
+        if message.chat.id != settings.admin_chat_id:
             await message.answer("Команда доступна только в админ-чате.")
             return
-        if not message.text:
+        args = _command_args(message.text, 2)
+        if not args:
             await message.answer("Формат: /block <tg_id|order_id> [причина]")
             return
-        parts = message.text.split(" ", 2)
-        if len(parts) < 2 or not parts[1].strip():
-            await message.answer("Формат: /block <tg_id|order_id> [причина]")
-            return
-        target = parts[1].strip()
-        reason = parts[2].strip() if len(parts) > 2 and parts[2].strip() else "blocked by admin"
-        target_tg_id = resolve_target_tg_id(target)
+        target = args[0]
+        reason = args[1] if len(args) > 1 else "blocked by admin"
+        target_tg_id = await resolve_target_tg_id(target)
         if target_tg_id is None:
             await message.answer("Укажите корректный tg_id или Order ID (RB-...).")
             return
-        container.repository.block_user(
+        await asyncio.to_thread(
+            repository.block_user,
             tg_id=target_tg_id,
             blocked_by=message.from_user.id,
             reason=reason,
@@ -447,39 +563,33 @@ def build_router(container: AppContainer, bot: Bot) -> Router:
 
     @router.message(Command("unblock"))
     async def admin_unblock_user(message: Message) -> None:
-        if message.chat.id != container.settings.admin_chat_id:
+        if message.chat.id != settings.admin_chat_id:
             await message.answer("Команда доступна только в админ-чате.")
             return
-        if not message.text:
-            await message.answer("Формат: /unblock <tg_id|order_id>")
-            return
-        parts = message.text.split(" ", 1)
-        if len(parts) < 2 or not parts[1].strip():
+        args = _command_args(message.text, 1)
+        if not args:
             await message.answer("Формат: /unblock <tg_id|order_id>")
             return
-        target_tg_id = resolve_target_tg_id(parts[1].strip())
+        target_tg_id = await resolve_target_tg_id(args[0])
         if target_tg_id is None:
             await message.answer("Укажите корректный tg_id или Order ID (RB-...).")
             return
-        container.repository.unblock_user(target_tg_id)
+        await asyncio.to_thread(repository.unblock_user, target_tg_id)
         await message.answer(f"Пользователь {target_tg_id} разблокирован.")
 
     @router.message(Command("close"))
     async def admin_close_order(message: Message) -> None:
-        if message.chat.id != container.settings.admin_chat_id:
+        if message.chat.id != settings.admin_chat_id:
             await message.answer("Команда доступна только в админ-чате.")
             return
-        if not message.text:
+        args = _command_args(message.text, 3)
+        if len(args) < 2:
             await message.answer("Формат: /close <order_id> <cancel|error> [причина]")
             return
-        parts = message.text.split(" ", 3)
-        if len(parts) < 3:
-            await message.answer("Формат: /close <order_id> <cancel|error> [причина]")
-            return
-        order_id = parts[1].strip()
-        mode = parts[2].strip().lower()
-        reason = parts[3].strip() if len(parts) > 3 and parts[3].strip() else "Closed by admin"
-        order = container.repository.get_order(order_id)
+        order_id = args[0]
+        mode = args[1].lower()
+        reason = args[2] if len(args) > 2 else "Closed by admin"
+        order = await asyncio.to_thread(repository.get_order, order_id)
         if order is None:
             await message.answer("Order ID не найден.")
             return
@@ -489,9 +599,10 @@ def build_router(container: AppContainer, bot: Bot) -> Router:
 
         try:
             if mode == "cancel":
-                updated = container.repository.transition_order(
+                updated = await asyncio.to_thread(
+                    repository.transition_order,
                     order_id=order_id,
-                    target_status=OrderStatus.CANCELLED.value,
+                    target_status=STATUS_CANCELLED,
                 )
                 admin_action = "CLOSE_CANCEL"
                 user_text = (
@@ -500,7 +611,8 @@ def build_router(container: AppContainer, bot: Bot) -> Router:
                     "Статус: CANCELLED"
                 )
             else:
-                updated = container.repository.mark_order_error(
+                updated = await asyncio.to_thread(
+                    repository.mark_order_error,
                     order_id=order_id,
                     error_code="ADMIN_CLOSED",
                     error_text=reason,
@@ -515,7 +627,7 @@ def build_router(container: AppContainer, bot: Bot) -> Router:
             await message.answer(f"Не удалось закрыть заказ: {exc}")
             return
 
-        container.repository.log_admin_action(
+        log_admin_action(
             order_id=updated["order_id"],
             admin_id=message.from_user.id,
             admin_username=message.from_user.username,
@@ -524,17 +636,14 @@ def build_router(container: AppContainer, bot: Bot) -> Router:
         )
         await message.answer(f"Заказ {updated['order_id']} закрыт: {updated['status']}.")
         try:
-            await bot.send_message(chat_id=int(updated["tg_id"]), text=user_text)
+            await bot.send_message(chat_id=updated["tg_id"], text=user_text)
         except Exception:
             pass
 
-    @router.callback_query(F.data.startswith("product:"))
-    async def choose_product(callback: CallbackQuery) -> None:
+    async def choose_product(callback: CallbackQuery, product_code: str) -> None:
         if not await ensure_not_blocked_callback(callback):
             return
-        product_code = callback.data.split(":", 1)[1]
-        product_code = PRODUCT_ALIASES.get(product_code, product_code)
-        product = container.products.get(product_code)
+        product = products_by_code.get(product_code)
         if not product:
             await callback.answer("Продукт не найден", show_alert=True)
             return
@@ -543,87 +652,76 @@ def build_router(container: AppContainer, bot: Bot) -> Router:
             if callback.message is None:
                 await callback.answer("Сообщение недоступно", show_alert=True)
                 return
-            await ask_variable_amount(callback.message, product.code, tg_id=callback.from_user.id)
             await callback.answer()
+            await ask_variable_amount(callback.message, product.code, tg_id=callback.from_user.id)
             return
         if product.provider == "claude":
             if callback.message is None:
                 await callback.answer("Сообщение недоступно", show_alert=True)
                 return
-            await ask_claude_checkout_precheck(callback.message, product.code, tg_id=callback.from_user.id)
             await callback.answer()
+            await ask_claude_checkout_precheck(callback.message, product.code, tg_id=callback.from_user.id)
             return
 
+        await callback.answer()
         clear_pending_inputs(callback.from_user.id)
         await callback.message.answer(
-            product_confirmation_text(product),
-            reply_markup=confirm_product_keyboard(product.code),
+            confirmation_texts[product.code],
+            reply_markup=confirm_keyboards[product.code],
         )
-        await callback.answer()
 
-    @router.callback_query(F.data.startswith("provider:"))
-    async def choose_provider(callback: CallbackQuery) -> None:
+    async def choose_provider(callback: CallbackQuery, provider: str) -> None:
         if not await ensure_not_blocked_callback(callback):
             return
-        provider = callback.data.split(":", 1)[1]
-        has_products = any(
-            not product.hidden and product.provider == provider for product in container.products.values()
-        )
-        if not has_products:
+        product_keyboard = product_keyboards.get(provider)
+        if product_keyboard is None:
             await callback.answer("В этой категории пока нет тарифов", show_alert=True)
             return
 
+        await callback.answer()
         provider_title = PROVIDER_TITLES.get(provider, provider.title())
         await callback.message.answer(
             f"Выберите подписку: {provider_title}",
-            reply_markup=product_picker_keyboard(container.products, provider=provider, include_back=True),
+            reply_markup=product_keyboard,
         )
-        await callback.answer()
 
     @router.callback_query(F.data == "providers")
     async def show_providers(callback: CallbackQuery) -> None:
         if not await ensure_not_blocked_callback(callback):
             return
+        await callback.answer()
         await callback.message.answer(
-            "Что оформить?\n\n" + SUPPORT_HINT,
-            reply_markup=provider_picker_keyboard(container.products),
+            CHOOSE_PROVIDER_TEXT,
+            reply_markup=provider_keyboard,
         )
-        await callback.answer()
 
     @router.callback_query(F.data == "choose_other")
     async def choose_other(callback: CallbackQuery) -> None:
         if not await ensure_not_blocked_callback(callback):
             return
+        await callback.answer()
         await callback.message.answer(
-            "Выберите подписку:\n\n" + SUPPORT_HINT,
-            reply_markup=provider_picker_keyboard(container.products),
+            CHOOSE_SUBSCRIPTION_TEXT,
+            reply_markup=provider_keyboard,
         )
-        await callback.answer()
 
     @router.callback_query(F.data == "ask_operator")
     async def ask_operator(callback: CallbackQuery) -> None:
         if not await ensure_not_blocked_callback(callback):
             return
+        await callback.answer()
         cooldown_left = operator_request_cooldown_left(callback.from_user.id)
         if cooldown_left > 0:
             if callback.message is not None:
                 await callback.message.answer(f"Подождите {cooldown_left} сек. перед следующим запросом оператору.")
-            await callback.answer()
             return
         mark_operator_request(callback.from_user.id)
+        sends = [send_admin(admin_operator_request(callback.from_user.username, callback.from_user.id))]
         if callback.message is not None:
-            await callback.message.answer(
-                "Оператору отправлен запрос. Ожидайте ответ в этом чате."
-            )
-        await send_admin(
-            "CLIENT NEEDS OPERATOR\n"
-            f"Пользователь: @{callback.from_user.username or 'без_username'} "
-            f"(id: {callback.from_user.id})"
-        )
-        await callback.answer()
+            sends.append(callback.message.answer(**OPERATOR_REQUEST_SENT_MESSAGE))
+        await asyncio.gather(*sends)
 
-    @router.callback_query(F.data.startswith("pay_details:"))
-    async def show_manual_payment_details(callback: CallbackQuery) -> None:
+    async def show_manual_payment_details(callback: CallbackQuery, order_id: str) -> None:
         if not await ensure_not_blocked_callback(callback):
             return
         if not is_manual_payment_mode():
@@ -632,35 +730,51 @@ def build_router(container: AppContainer, bot: Bot) -> Router:
         if callback.message is None:
             await callback.answer("Сообщение недоступно", show_alert=True)
             return
-        order_id = callback.data.split(":", 1)[1]
-        order = container.repository.get_order(order_id)
-        if order is None or int(order["tg_id"]) != callback.from_user.id:
+        order = await asyncio.to_thread(repository.get_order, order_id)
+        if order is None or order["tg_id"] != callback.from_user.id:
             await callback.answer("Заказ не найден", show_alert=True)
             return
-        if order["status"] != OrderStatus.WAIT_PAY.value:
+        await callback.answer()
+        if order["status"] != STATUS_WAIT_PAY:
             await callback.message.answer(
                 f"Этот заказ уже не ждёт оплату. Текущий статус: {order['status']}"
             )
-            await callback.answer()
             return
         await callback.message.answer(
             manual_payment_details_text(
                 order_id=order["order_id"],
-                phone=container.settings.manual_pay_phone,
-                banks=container.settings.manual_pay_banks,
-                receiver=container.settings.manual_pay_receiver,
-                card=container.settings.manual_pay_card,
+                phone=settings.manual_pay_phone,
+                banks=settings.manual_pay_banks,
+                receiver=settings.manual_pay_receiver,
+                card=settings.manual_pay_card,
             )
         )
-        await callback.answer()
 
-    @router.callback_query(F.data.startswith("confirm:"))
-    async def confirm_product(callback: CallbackQuery) -> None:
+    async def create_order_from_callback(
+        callback: CallbackQuery,
+        product: Product,
+        source_key: str,
+    ) -> CreateOrderResult | None:
+        try:
+            return await asyncio.to_thread(
+                order_flow.create_or_resume_order,
+                tg_id=callback.from_user.id,
+                username=callback.from_user.username,
+                source_key=source_key,
+                product_code=product.code,
+            )
+        except UserHasOpenOrderError as exc:
+            await callback.message.answer(format_open_order_message(exc))
+            await callback.answer("Есть незакрытый заказ", show_alert=True)
+        except DailyOrderLimitExceededError as exc:
+            await callback.message.answer(daily_order_limit_text(exc.limit))
+            await callback.answer("Достигнут дневной лимит", show_alert=True)
+        return None
+
+    async def confirm_product(callback: CallbackQuery, product_code: str) -> None:
         if not await ensure_not_blocked_callback(callback):
             return
-        product_code = callback.data.split(":", 1)[1]
-        product_code = PRODUCT_ALIASES.get(product_code, product_code)
-        product = container.products.get(product_code)
+        product = products_by_code.get(product_code)
         if product is None:
             await callback.answer("Продукт не найден", show_alert=True)
             return
@@ -668,8 +782,8 @@ def build_router(container: AppContainer, bot: Bot) -> Router:
             if callback.message is None:
                 await callback.answer("Сообщение недоступно", show_alert=True)
                 return
-            await ask_variable_amount(callback.message, product.code, tg_id=callback.from_user.id)
             await callback.answer()
+            await ask_variable_amount(callback.message, product.code, tg_id=callback.from_user.id)
             return
         if product.provider == "claude":
             passed_code = claude_precheck_passed.get(callback.from_user.id)
@@ -682,78 +796,43 @@ def build_router(container: AppContainer, bot: Bot) -> Router:
                 return
             claude_precheck_passed.pop(callback.from_user.id, None)
 
-        container.repository.upsert_user(
+        await asyncio.to_thread(
+            repository.upsert_user,
             tg_id=callback.from_user.id,
             username=callback.from_user.username,
-            source_key=product_code,
+            source_key=product.code,
         )
 
-        try:
-            result = container.order_flow.create_or_resume_order(
-                tg_id=callback.from_user.id,
-                username=callback.from_user.username,
-                source_key=product_code,
-                product_code=product_code,
-            )
-        except UserHasOpenOrderError as exc:
-            await callback.message.answer(format_open_order_message(exc))
-            await callback.answer("Есть незакрытый заказ", show_alert=True)
-            return
-        except DailyOrderLimitExceededError as exc:
-            await callback.message.answer(
-                f"Лимит создания заказов: {exc.limit} в сутки.\n"
-                "Попробуйте завтра или напишите оператору: /operator"
-            )
-            await callback.answer("Достигнут дневной лимит", show_alert=True)
+        result = await create_order_from_callback(callback, product, product.code)
+        if result is None:
             return
         order = result.order
 
-        if result.reused_active_order and order["status"] != OrderStatus.WAIT_PAY.value:
+        await callback.answer()
+        if result.reused_active_order and order["status"] != STATUS_WAIT_PAY:
             await callback.message.answer(
-                "У вас уже есть активный заказ по этому продукту.\n"
-                f"Order ID: {order['order_id']}\n"
-                f"Статус: {_order_status_hint(order['status'])}"
+                active_product_order_text(order["order_id"], _order_status_hint(order["status"]))
             )
-            await callback.answer()
             return
 
-        await send_wait_pay_messages(callback.message, order, result.payment.pay_url)
-
-        if not result.reused_active_order:
-            await send_admin(admin_new_lead(order, source_label=order.get("source_key") or "unknown"))
-        await callback.answer()
+        await send_order_created(callback.message, result, source_label=order.get("source_key") or "unknown")
 
     @router.message(Command("status"))
     async def status_command(message: Message) -> None:
         if not await ensure_not_blocked_message(message):
             return
-        order_id = None
-        if message.text and " " in message.text:
-            order_id = message.text.split(" ", 1)[1].strip()
+        order_id = (message.text or "").partition(" ")[2].strip() or None
 
         if order_id:
-            order = container.repository.get_order(order_id)
-            if order is None or int(order["tg_id"]) != message.from_user.id:
+            order = await asyncio.to_thread(repository.get_order, order_id)
+            if order is None or order["tg_id"] != message.from_user.id:
                 await message.answer("Заказ не найден.")
                 return
         else:
-            active = container.repository.list_orders_by_user_and_statuses(
-                tg_id=message.from_user.id,
-                statuses=[
-                    OrderStatus.NEW.value,
-                    OrderStatus.WAIT_PAY.value,
-                    OrderStatus.PAID.value,
-                    OrderStatus.WAIT_SERVICE_LINK.value,
-                    OrderStatus.READY_FOR_OPERATOR.value,
-                    OrderStatus.IN_PROGRESS.value,
-                    OrderStatus.DONE.value,
-                    OrderStatus.WAIT_CLIENT_CONFIRM.value,
-                ],
-            )
-            if not active:
+            order = await asyncio.to_thread(repository.find_active_order_any, message.from_user.id)
+            if order is None:
                 await message.answer("Активных заказов нет.")
                 return
-            order = active[0]
 
         await message.answer(
             f"Order ID: {order['order_id']}\n"
@@ -765,79 +844,64 @@ def build_router(container: AppContainer, bot: Bot) -> Router:
     async def cancel_command(message: Message) -> None:
         if not await ensure_not_blocked_message(message):
             return
-        order_id = None
-        if message.text and " " in message.text:
-            order_id = message.text.split(" ", 1)[1].strip()
+        order_id = (message.text or "").partition(" ")[2].strip() or None
         if not order_id:
             await message.answer("Укажите order_id: /cancel RB-...")
             return
 
-        order = container.repository.get_order(order_id)
-        if order is None or int(order["tg_id"]) != message.from_user.id:
+        order = await asyncio.to_thread(repository.get_order, order_id)
+        if order is None or order["tg_id"] != message.from_user.id:
             await message.answer("Заказ не найден.")
             return
 
         try:
-            cancelled = container.repository.transition_order(
+            cancelled = await asyncio.to_thread(
+                repository.transition_order,
                 order_id=order_id,
-                target_status=OrderStatus.CANCELLED.value,
+                target_status=STATUS_CANCELLED,
             )
-            await message.answer(f"Заказ {cancelled['order_id']} отменён.")
-            await send_admin(f"ORDER CANCELLED\nOrder ID: {cancelled['order_id']}")
         except Exception:
             await message.answer("Заказ нельзя отменить на текущем статусе.")
+            return
+        await asyncio.gather(
+            message.answer(f"Заказ {cancelled['order_id']} отменён."),
+            send_admin(admin_order_cancelled(cancelled)),
+        )
 
-    @router.callback_query(F.data.startswith("check:"))
-    async def check_payment(callback: CallbackQuery) -> None:
+    async def check_payment(callback: CallbackQuery, order_id: str) -> None:
         if not await ensure_not_blocked_callback(callback):
             return
-        order_id = callback.data.split(":", 1)[1]
-        order = container.repository.get_order(order_id)
-        if order is None or int(order["tg_id"]) != callback.from_user.id:
+        order = await asyncio.to_thread(repository.get_order, order_id)
+        if order is None or order["tg_id"] != callback.from_user.id:
             await callback.answer("Заказ не найден", show_alert=True)
             return
 
-        if order["status"] == OrderStatus.WAIT_PAY.value:
-            if is_manual_payment_mode():
-                await callback.message.answer(
-                    "Платёж пока не подтверждён. Пришлите скриншот оплаты в этот чат."
-                )
-            else:
-                await callback.message.answer(
-                    "Платёж пока не подтверждён. Обновление приходит автоматически по webhook."
-                )
-        elif order["status"] in {
-            OrderStatus.PAID.value,
-            OrderStatus.WAIT_SERVICE_LINK.value,
-            OrderStatus.READY_FOR_OPERATOR.value,
-            OrderStatus.IN_PROGRESS.value,
-            OrderStatus.WAIT_CLIENT_CONFIRM.value,
-            OrderStatus.CLIENT_CONFIRMED.value,
-        }:
-            await callback.message.answer(f"Текущий статус заказа: {order['status']}")
+        if order["status"] != STATUS_WAIT_PAY:
+            status_text = f"Текущий статус заказа: {order['status']}"
+        elif is_manual_payment_mode():
+            status_text = "Платёж пока не подтверждён. Пришлите скриншот оплаты в этот чат."
         else:
-            await callback.message.answer(f"Текущий статус заказа: {order['status']}")
-        await callback.answer()
+            status_text = "Платёж пока не подтверждён. Обновление приходит автоматически по webhook."
+        await callback.answer(status_text, show_alert=True)
 
-    @router.callback_query(F.data.startswith("test_paid:"))
-    async def test_paid(callback: CallbackQuery) -> None:
+    async def test_paid(callback: CallbackQuery, order_id: str) -> None:
         if not await ensure_not_blocked_callback(callback):
             return
         if is_manual_payment_mode():
             await callback.answer("Недоступно в ручном режиме оплаты", show_alert=True)
             return
-        if not container.settings.payment_test_mode:
+        if not settings.payment_test_mode:
             await callback.answer("Кнопка доступна только в test mode", show_alert=True)
             return
         if callback.message is None:
             await callback.answer("Сообщение недоступно", show_alert=True)
             return
-        order_id = callback.data.split(":", 1)[1]
-        order = container.repository.get_order(order_id)
-        if order is None or int(order["tg_id"]) != callback.from_user.id:
+        order = await asyncio.to_thread(repository.get_order, order_id)
+        if order is None or order["tg_id"] != callback.from_user.id:
             await callback.answer("Заказ не найден", show_alert=True)
             return
-        result = container.order_flow.handle_successful_payment_webhook(
+        result = await asyncio.to_thread(
+            order_flow.handle_successful_payment_webhook,
             inv_id=int(order["payment_inv_id"]),
             out_sum=str(order.get("payment_out_sum") or order["price_rub"]),
             payment_status_text="test_mode_manual_confirm",
@@ -845,147 +909,149 @@ def build_router(container: AppContainer, bot: Bot) -> Router:
         if not result.updated or result.order is None:
             await callback.answer("Статус не изменился", show_alert=True)
             return
-        await notify_payment_confirmed(container, bot, result.order)
         await callback.answer("Оплата подтверждена в тестовом режиме")
+        await notify_payment_confirmed(container, bot, result.order)
 
-    @router.callback_query(F.data.startswith("test_fail:"))
-    async def test_fail(callback: CallbackQuery) -> None:
+    async def test_fail(callback: CallbackQuery, order_id: str) -> None:
         if not await ensure_not_blocked_callback(callback):
             return
         if is_manual_payment_mode():
             await callback.answer("Недоступно в ручном режиме оплаты", show_alert=True)
             return
-        if not container.settings.payment_test_mode:
+        if not settings.payment_test_mode:
             await callback.answer("Кнопка доступна только в test mode", show_alert=True)
             return
         if callback.message is None:
             await callback.answer("Сообщение недоступно", show_alert=True)
             return
-        order_id = callback.data.split(":", 1)[1]
-        order = container.repository.get_order(order_id)
-        if order is None or int(order["tg_id"]) != callback.from_user.id:
+        order = await asyncio.to_thread(repository.get_order, order_id)
+        if order is None or order["tg_id"] != callback.from_user.id:
             await callback.answer("Заказ не найден", show_alert=True)
             return
-        if order["status"] != OrderStatus.WAIT_PAY.value:
+        if order["status"] != STATUS_WAIT_PAY:
             await callback.answer("Заказ уже не ждёт оплату", show_alert=True)
             return
 
+        await callback.answer("Показал сценарий отказа оплаты")
         await send_wait_pay_resume(
             callback.message,
             order,
             reason="Оплата не прошла или была отменена. Вы можете попробовать снова.",
         )
-        await callback.answer("Показал сценарий отказа оплаты")
 
-    @router.callback_query(F.data.startswith("cancel:"))
-    async def cancel_order(callback: CallbackQuery) -> None:
+    async def cancel_order(callback: CallbackQuery, order_id: str) -> None:
         if not await ensure_not_blocked_callback(callback):
             return
-        order_id = callback.data.split(":", 1)[1]
-        order = container.repository.get_order(order_id)
-        if order is None or int(order["tg_id"]) != callback.from_user.id:
+        order = await asyncio.to_thread(repository.get_order, order_id)
+        if order is None or order["tg_id"] != callback.from_user.id:
             await callback.answer("Заказ не найден", show_alert=True)
             return
 
+        await callback.answer()
         try:
-            cancelled = container.repository.transition_order(
+            cancelled = await asyncio.to_thread(
+                repository.transition_order,
                 order_id=order_id,
-                target_status=OrderStatus.CANCELLED.value,
+                target_status=STATUS_CANCELLED,
             )
-            await callback.message.answer(f"Заказ {cancelled['order_id']} отменён.")
-            await send_admin(f"ORDER CANCELLED\nOrder ID: {cancelled['order_id']}")
         except Exception:
             await callback.message.answer("Заказ нельзя отменить на текущем статусе.")
-        await callback.answer()
+        else:
+            await asyncio.gather(
+                callback.message.answer(f"Заказ {cancelled['order_id']} отменён."),
+                send_admin(admin_order_cancelled(cancelled)),
+            )
 
-    @router.callback_query(F.data.startswith("client_ok:"))
-    async def client_ok(callback: CallbackQuery) -> None:
+    async def client_ok(callback: CallbackQuery, order_id: str) -> None:
         if not await ensure_not_blocked_callback(callback):
             return
-        order_id = callback.data.split(":", 1)[1]
-        order = container.repository.get_order(order_id)
-        if order is None or int(order["tg_id"]) != callback.from_user.id:
+        order = await asyncio.to_thread(repository.get_order, order_id)
+        if order is None or order["tg_id"] != callback.from_user.id:
             await callback.answer("Заказ не найден", show_alert=True)
             return
-        if order["status"] != OrderStatus.WAIT_CLIENT_CONFIRM.value:
+        if order["status"] != STATUS_WAIT_CLIENT_CONFIRM:
             await callback.answer("Этот заказ уже закрыт.", show_alert=True)
             return
 
-        updated = container.order_flow.mark_client_confirmed(order)
-        product = container.products[updated["product_code"]]
-        end_date = (date.today() + timedelta(days=product.duration_days)).isoformat()
-        await callback.message.answer(
-            f"Отлично, заказ закрыт ✅\n"
-            f"Напомним о продлении за 3 дня и в день окончания.\n"
-            f"Order ID: {updated['order_id']}"
-        )
-        await send_admin(
-            "CLIENT CONFIRMED\n"
-            f"Order ID: {updated['order_id']}\n"
-            f"Продукт: {updated['product_name']}\n"
-            f"Подписка активна до: {end_date}"
-        )
         await callback.answer()
+        updated = await asyncio.to_thread(order_flow.mark_client_confirmed, order)
+        product = products[updated["product_code"]]
+        end_date = subscription_end_date(product.code, product.duration_days)
+        await asyncio.gather(
+            callback.message.answer(
+                f"Отлично, заказ закрыт ✅\n"
+                f"Напомним о продлении за 3 дня и в день окончания.\n"
+                f"Order ID: {updated['order_id']}"
+            ),
+            send_admin(admin_client_confirmed(updated, end_date)),
+        )
 
-    @router.callback_query(F.data.startswith("client_fail:"))
-    async def client_fail(callback: CallbackQuery) -> None:
+    async def client_fail(callback: CallbackQuery, order_id: str) -> None:
         if not await ensure_not_blocked_callback(callback):
             return
-        order_id = callback.data.split(":", 1)[1]
-        order = container.repository.get_order(order_id)
-        if order is None or int(order["tg_id"]) != callback.from_user.id:
+        order = await asyncio.to_thread(repository.get_order, order_id)
+        if order is None or order["tg_id"] != callback.from_user.id:
             await callback.answer("Заказ не найден", show_alert=True)
             return
-        if order["status"] != OrderStatus.WAIT_CLIENT_CONFIRM.value:
+        if order["status"] != STATUS_WAIT_CLIENT_CONFIRM:
             await callback.answer("Этот заказ уже закрыт.", show_alert=True)
             return
 
-        errored = container.repository.mark_order_error(
+        await callback.answer()
+        errored = await asyncio.to_thread(
+            repository.mark_order_error,
             order_id=order_id,
             error_code="CLIENT_NOT_ACTIVE",
             error_text="Клиент сообщил: не активно",
         )
-        await callback.message.answer("Понял, подключаю оператора. Поможем вручную.")
-        await send_admin(
-            "CLIENT REPORTED ISSUE\n"
-            f"Order ID: {errored['order_id']}\n"
-            f"Ошибка: {errored['error_text']}"
+        await asyncio.gather(
+            callback.message.answer("Понял, подключаю оператора. Поможем вручную."),
+            send_admin(admin_client_issue(errored)),
         )
-        await callback.answer()
 
-    @router.callback_query(F.data.startswith("renew:"))
-    async def renew_order(callback: CallbackQuery) -> None:
+    async def renew_order(callback: CallbackQuery, product_code: str) -> None:
         if not await ensure_not_blocked_callback(callback):
             return
-        product_code = callback.data.split(":", 1)[1]
-        product_code = PRODUCT_ALIASES.get(product_code, product_code)
-        product = container.products.get(product_code)
+        product = products_by_code.get(product_code)
         if product is None:
             await callback.answer("Продукт не найден", show_alert=True)
             return
 
-        try:
-            result = container.order_flow.create_or_resume_order(
-                tg_id=callback.from_user.id,
-                username=callback.from_user.username,
-                source_key=f"renew_{product_code}",
-                product_code=product_code,
-            )
-        except UserHasOpenOrderError as exc:
-            await callback.message.answer(format_open_order_message(exc))
-            await callback.answer("Есть незакрытый заказ", show_alert=True)
+        source_key = f"renew_{product.code}"
+        result = await create_order_from_callback(callback, product, source_key)
+        if result is None:
             return
-        except DailyOrderLimitExceededError as exc:
-            await callback.message.answer(
-                f"Лимит создания заказов: {exc.limit} в сутки.\n"
-                "Попробуйте завтра или напишите оператору: /operator"
-            )
-            await callback.answer("Достигнут дневной лимит", show_alert=True)
-            return
-        await send_wait_pay_messages(callback.message, result.order, result.payment.pay_url)
-        if not result.reused_active_order:
-            await send_admin(admin_new_lead(result.order, source_label=f"renew_{product_code}"))
         await callback.answer()
+        await send_order_created(callback.message, result, source_label=source_key)
+
+    callback_handlers: dict[str, CallbackHandler] = {
+        "product": choose_product,
+        "provider": choose_provider,
+        "pay_details": show_manual_payment_details,
+        "confirm": confirm_product,
+        "check": check_payment,
+        "test_paid": test_paid,
+        "test_fail": test_fail,
+        "cancel": cancel_order,
+        "client_ok": client_ok,
+        "client_fail": client_fail,
+        "renew": renew_order,
+    }
+    coalesced_callback_handlers = frozenset(callback_handlers[prefix] for prefix in COALESCED_CALLBACK_PREFIXES)
+
+    @router.callback_query(CallbackPrefix(callback_handlers))
+    async def dispatch_callback(
+        callback: CallbackQuery,
+        callback_handler: CallbackHandler,
+        callback_arg: str,
+    ) -> None:
+        if callback_handler in coalesced_callback_handlers:
+            tap_key = (callback.from_user.id, callback.data)
+            if tap_key in recent_callback_taps:
+                await callback.answer("Подождите...")
+                return
+            recent_callback_taps.set(tap_key, True)
+        await callback_handler(callback, callback_arg)
 
     @router.message(F.chat.type == "private")
     async def handle_private_text(message: Message) -> None:
@@ -996,23 +1062,30 @@ def build_router(container: AppContainer, bot: Bot) -> Router:
         if not has_text and not has_media:
             return
         text = message.text.strip() if has_text else ""
-        container.repository.upsert_user(
-            tg_id=message.from_user.id,
-            username=message.from_user.username,
-            source_key=None,
-        )
+        touch_key = (message.from_user.id, message.from_user.username)
+        if touch_key not in recent_user_touches:
+            await asyncio.to_thread(
+                repository.upsert_user,
+                tg_id=message.from_user.id,
+                username=message.from_user.username,
+                source_key=None,
+            )
+            recent_user_touches.set(touch_key, True)
 
-        wait_pay_orders = container.repository.list_orders_by_user_and_statuses(
+        waiting_orders = await asyncio.to_thread(
+            repository.list_orders_by_user_and_statuses,
             tg_id=message.from_user.id,
-            statuses=[OrderStatus.WAIT_PAY.value],
+            statuses=WAITING_INPUT_STATUSES,
+            limit=WAITING_INPUT_ORDERS_LIMIT,
         )
+        wait_pay_order = next((order for order in waiting_orders if order["status"] == STATUS_WAIT_PAY), None)
         if is_manual_payment_mode() and has_media:
-            if not wait_pay_orders:
+            if wait_pay_order is None:
                 await message.answer("Активного заказа на оплату не найдено. Используйте /start.")
                 return
-            target_order = wait_pay_orders[0]
+            target_order = wait_pay_order
             try:
-                await message.copy_to(chat_id=container.settings.admin_chat_id)
+                await message.copy_to(chat_id=settings.admin_chat_id)
             except Exception:
                 pass
             await send_admin(
@@ -1028,13 +1101,13 @@ def build_router(container: AppContainer, bot: Bot) -> Router:
             )
             return
         if not has_text:
-            if is_manual_payment_mode() and wait_pay_orders:
+            if is_manual_payment_mode() and wait_pay_order is not None:
                 await message.answer("Ожидаем скриншот оплаты по вашему заказу.")
             return
 
-        lower_text = text.lower()
-        if lower_text.startswith("мод:") or lower_text.startswith("mod:"):
-            question = text.split(":", 1)[1].strip()
+        operator_prefix = OPERATOR_QUESTION_PREFIX_PATTERN.match(text)
+        if operator_prefix is not None:
+            question = text[operator_prefix.end():].strip()
             if not question:
                 await message.answer("После МОД: напишите ваш вопрос оператору.")
                 return
@@ -1044,33 +1117,23 @@ def build_router(container: AppContainer, bot: Bot) -> Router:
                 return
             mark_operator_request(message.from_user.id)
 
-            active_orders = container.repository.list_orders_by_user_and_statuses(
-                tg_id=message.from_user.id,
-                statuses=[
-                    OrderStatus.NEW.value,
-                    OrderStatus.WAIT_PAY.value,
-                    OrderStatus.PAID.value,
-                    OrderStatus.WAIT_SERVICE_LINK.value,
-                    OrderStatus.READY_FOR_OPERATOR.value,
-                    OrderStatus.IN_PROGRESS.value,
-                    OrderStatus.DONE.value,
-                    OrderStatus.WAIT_CLIENT_CONFIRM.value,
-                ],
-            )
+            active_order = await asyncio.to_thread(repository.find_active_order_any, message.from_user.id)
             order_context = ""
-            if active_orders:
+            if active_order is not None:
                 order_context = (
-                    f"\nOrder ID: {active_orders[0]['order_id']}"
-                    f"\nСтатус: {active_orders[0]['status']}"
+                    f"\nOrder ID: {active_order['order_id']}"
+                    f"\nСтатус: {active_order['status']}"
                 )
 
-            await send_admin(
-                "CLIENT QUESTION\n"
-                f"Пользователь: @{message.from_user.username or 'без_username'} (id: {message.from_user.id})"
-                f"{order_context}\n"
-                f"Сообщение: {question}"
+            await asyncio.gather(
+                send_admin(
+                    "CLIENT QUESTION\n"
+                    f"Пользователь: @{message.from_user.username or 'без_username'} (id: {message.from_user.id})"
+                    f"{order_context}\n"
+                    f"Сообщение: {question}"
+                ),
+                message.answer("Сообщение отправлено оператору. Ожидайте ответ в этом чате."),
             )
-            await message.answer("Сообщение отправлено оператору. Ожидайте ответ в этом чате.")
             return
 
         pending_product_code = pending_variable_price_input.get(message.from_user.id)
@@ -1084,14 +1147,15 @@ def build_router(container: AppContainer, bot: Bot) -> Router:
                 return
 
             pending_variable_price_input.pop(message.from_user.id, None)
-            product = container.products.get(pending_product_code)
+            product = products.get(pending_product_code)
             if product is None:
                 await message.answer("Продукт временно недоступен, попробуйте позже.")
                 return
 
             price_rub = _variable_price_rub(usd_amount)
             try:
-                result = container.order_flow.create_or_resume_order(
+                result = await asyncio.to_thread(
+                    order_flow.create_or_resume_order,
                     tg_id=message.from_user.id,
                     username=message.from_user.username,
                     source_key=f"{pending_product_code}:{usd_amount}usd",
@@ -1103,28 +1167,21 @@ def build_router(container: AppContainer, bot: Bot) -> Router:
                 await message.answer(format_open_order_message(exc))
                 return
             except DailyOrderLimitExceededError as exc:
-                await message.answer(
-                    f"Лимит создания заказов: {exc.limit} в сутки.\n"
-                    "Попробуйте завтра или напишите оператору: /operator"
-                )
+                await message.answer(daily_order_limit_text(exc.limit))
                 return
             order = result.order
-            if result.reused_active_order and order["status"] != OrderStatus.WAIT_PAY.value:
+            if result.reused_active_order and order["status"] != STATUS_WAIT_PAY:
                 await message.answer(
-                    "У вас уже есть активный заказ по этому продукту.\n"
-                    f"Order ID: {order['order_id']}\n"
-                    f"Статус: {_order_status_hint(order['status'])}"
+                    active_product_order_text(order["order_id"], _order_status_hint(order["status"]))
                 )
                 return
 
-            await send_wait_pay_messages(message, order, result.payment.pay_url)
-            if not result.reused_active_order:
-                await send_admin(admin_new_lead(order, source_label=order.get("source_key") or "unknown"))
+            await send_order_created(message, result, source_label=order.get("source_key") or "unknown")
             return
 
         pending_claude_product_code = pending_claude_checkout_input.get(message.from_user.id)
         if pending_claude_product_code:
-            product = container.products.get(pending_claude_product_code)
+            product = products.get(pending_claude_product_code)
             if product is None:
                 pending_claude_checkout_input.pop(message.from_user.id, None)
                 await message.answer("Продукт временно недоступен, попробуйте позже.")
@@ -1140,60 +1197,55 @@ def build_router(container: AppContainer, bot: Bot) -> Router:
                 return
 
             pending_claude_checkout_input.pop(message.from_user.id, None)
-            claude_precheck_passed[message.from_user.id] = pending_claude_product_code
+            claude_precheck_passed.set(message.from_user.id, pending_claude_product_code)
             await message.answer(
                 "Проверка пройдена ✅\n"
                 "Ссылка выглядит корректно. Перед фактической оплатой позже создайте новую checkout-ссылку "
                 "(они имеют ограниченное время жизни)."
             )
             await message.answer(
-                product_confirmation_text(product),
-                reply_markup=confirm_product_keyboard(product.code),
+                confirmation_texts[product.code],
+                reply_markup=confirm_keyboards[product.code],
             )
             return
 
-        if is_manual_payment_mode() and wait_pay_orders:
+        if is_manual_payment_mode() and wait_pay_order is not None:
             await message.answer(
                 "Платёж пока не подтверждён.\n"
                 "Нажмите «Оплатить», затем пришлите скриншот оплаты в этот чат."
             )
             return
 
-
-        waiting = container.repository.list_orders_by_user_and_statuses(
-            tg_id=message.from_user.id,
-            statuses=[OrderStatus.WAIT_SERVICE_LINK.value],
-        )
-        if not waiting:
-            await message.answer(
-                "Чтобы начать оформление, используйте /start или ссылку оффера.\n"
-                "Команды: /help\n"
-                + SUPPORT_HINT
-            )
+        waiting_link = [order for order in waiting_orders if order["status"] == STATUS_WAIT_SERVICE_LINK]
+        if not waiting_link:
+            await message.answer(NO_ORDER_CONTEXT_TEXT)
             return
 
-        target_order = waiting[0]
+        target_order = waiting_link[0]
         raw = text
-        if len(waiting) > 1 and " " in raw:
-            first, possible_url = raw.split(" ", 1)
-            maybe = container.repository.get_order(first.strip())
-            if maybe and int(maybe["tg_id"]) == message.from_user.id:
+        if " " in raw and len(waiting_link) > 1:
+            first, _, possible_url = raw.partition(" ")
+            maybe = await asyncio.to_thread(repository.get_order, first)
+            if maybe and maybe["tg_id"] == message.from_user.id:
                 target_order = maybe
-                raw = possible_url.strip()
+                raw = possible_url.lstrip()
 
-        product = container.products[target_order["product_code"]]
+        product = products[target_order["product_code"]]
         result = validate_service_link(raw, product.allowed_domains)
         if not result.is_valid:
-            await message.answer(invalid_service_link_text(result.error_text or "неизвестно"))
-            await send_admin(
-                "INVALID SERVICE LINK\n"
-                f"Order ID: {target_order['order_id']}\n"
-                f"Причина: {result.error_text or 'unknown'}"
+            await asyncio.gather(
+                message.answer(invalid_service_link_text(result.error_text or "неизвестно")),
+                send_admin(
+                    "INVALID SERVICE LINK\n"
+                    f"Order ID: {target_order['order_id']}\n"
+                    f"Причина: {result.error_text or 'unknown'}"
+                ),
             )
             return
 
         try:
-            updated = container.order_flow.set_service_link(
+            updated = await asyncio.to_thread(
+                order_flow.set_service_link,
                 order_id=target_order["order_id"],
                 link=result.normalized_url or raw,
             )
@@ -1203,152 +1255,203 @@ def build_router(container: AppContainer, bot: Bot) -> Router:
             )
             return
 
-        await message.answer(
-            "Ссылка получена ✅\n"
-            "Ожидайте подтверждения (обычно 5-30 минут)."
+        await asyncio.gather(
+            message.answer(
+                "Ссылка получена ✅\n"
+                "Ожидайте подтверждения (обычно 5-30 минут)."
+            ),
+            send_admin(
+                admin_link_received(updated),
+                reply_markup=admin_order_keyboard(updated["order_id"]),
+            ),
+        )
+
+    async def admin_pay_done(
+        order: dict[str, Any], admin_id: int, admin_username: str | None
+    ) -> tuple[str, bool]:
+        result = await asyncio.to_thread(order_flow.confirm_payment_manually, order_id=order["order_id"])
+        if not result.updated or result.order is None:
+            return f"Оплату нельзя подтвердить: {result.reason}", True
+        updated = result.order
+        log_admin_action(order["order_id"], admin_id, admin_username, "PAYMENT_DONE")
+        submit_outbox_for(updated["tg_id"], notify_payment_confirmed, container, bot, updated)
+        return f"PAYMENT DONE: {updated['order_id']}", False
+
+    async def admin_pay_retry(
+        order: dict[str, Any], admin_id: int, admin_username: str | None
+    ) -> tuple[str, bool]:
+        if order["status"] != STATUS_WAIT_PAY:
+            return "Заказ уже не в статусе WAIT_PAY", True
+        log_admin_action(order["order_id"], admin_id, admin_username, "PAYMENT_RETRY")
+        submit_outbox(
+            bot.send_message,
+            chat_id=order["tg_id"],
+            text=PAYMENT_RETRY_CLIENT_TEXT,
+            reply_markup=manual_payment_keyboard(order["order_id"]) if is_manual_payment_mode() else None,
+        )
+        return f"PAYMENT RETRY REQUESTED: {order['order_id']}", False
+
+    async def admin_claim(
+        order: dict[str, Any], admin_id: int, admin_username: str | None
+    ) -> tuple[str, bool]:
+        updated = await asyncio.to_thread(repository.claim_order, order["order_id"], admin_id, admin_username)
+        log_admin_action(order["order_id"], admin_id, admin_username, "CLAIM")
+        return f"CLAIM: {updated['order_id']} -> оператор @{admin_username or admin_id}", False
+
+    async def admin_progress(
+        order: dict[str, Any], admin_id: int, admin_username: str | None
+    ) -> tuple[str, bool]:
+        order_id = order["order_id"]
+        operator_id = order["operator_id"]
+        if operator_id and operator_id != admin_id:
+            return "Заказ занят другим оператором", True
+        updated = await asyncio.to_thread(repository.set_order_in_progress, order_id, admin_id, admin_username)
+        log_admin_action(order_id, admin_id, admin_username, "IN_PROGRESS")
+        return f"IN_PROGRESS: {updated['order_id']}", False
+
+    async def admin_done(
+        order: dict[str, Any], admin_id: int, admin_username: str | None
+    ) -> tuple[str, bool]:
+        order_id = order["order_id"]
+        operator_id = order["operator_id"]
+        if operator_id and operator_id != admin_id:
+            return "Заказ занят другим оператором", True
+        updated = await asyncio.to_thread(repository.complete_order, order_id, admin_id, admin_username)
+        log_admin_action(order_id, admin_id, admin_username, "DONE")
+        submit_outbox(
+            bot.send_message,
+            chat_id=updated["tg_id"],
+            text=ORDER_DONE_CLIENT_TEXT,
+            reply_markup=client_confirm_keyboard(updated["order_id"]),
+        )
+        return f"DONE: {updated['order_id']}", False
+
+    async def admin_error(
+        order: dict[str, Any], admin_id: int, admin_username: str | None
+    ) -> tuple[str, bool]:
+        updated = await asyncio.to_thread(
+            repository.mark_order_error,
+            order_id=order["order_id"],
+            error_code="OPERATOR_ERROR",
+            error_text="Оператор отметил ошибку выполнения",
+        )
+        log_admin_action(order["order_id"], admin_id, admin_username, "ERROR")
+        submit_outbox(
+            bot.send_message,
+            chat_id=updated["tg_id"],
+            text=ORDER_ERROR_CLIENT_TEXT,
         )
-        await send_admin(
-            admin_link_received(updated),
-            reply_markup=admin_order_keyboard(updated["order_id"]),
+        return f"ERROR: {updated['order_id']}", False
+
+    async def admin_template(
+        order: dict[str, Any], admin_id: int, admin_username: str | None
+    ) -> tuple[str, bool]:
+        product = products[order["product_code"]]
+        submit_outbox(
+            bot.send_message,
+            chat_id=order["tg_id"],
+            text=product.instruction_template,
         )
+        log_admin_action(order["order_id"], admin_id, admin_username, "SEND_TEMPLATE")
+        return f"TEMPLATE SENT: {order['order_id']}", False
+
+    admin_handlers = {
+        "admin_pay_done": admin_pay_done,
+        "admin_pay_retry": admin_pay_retry,
+        "admin_claim": admin_claim,
+        "admin_progress": admin_progress,
+        "admin_done": admin_done,
+        "admin_error": admin_error,
+        "admin_template": admin_template,
+    }
 
     @router.callback_query(F.data.startswith("admin_"))
     async def admin_actions(callback: CallbackQuery) -> None:
-        if callback.message is None or callback.message.chat.id != container.settings.admin_chat_id:
+        if callback.message is None or callback.message.chat.id != settings.admin_chat_id:
             await callback.answer("Доступно только в админ-чате", show_alert=True)
             return
 
-        action, order_id = callback.data.split(":", 1)
-        order = container.repository.get_order(order_id)
+        action, _, order_id = callback.data.partition(":")
+        handler = admin_handlers.get(action)
+        if handler is None:
+            await callback.answer("Неизвестное действие", show_alert=True)
+            return
+        order = await asyncio.to_thread(repository.get_order, order_id)
         if order is None:
             await callback.answer("Заказ не найден", show_alert=True)
             return
 
-        admin_id = callback.from_user.id
-        admin_username = callback.from_user.username
-
         try:
-            if action == "admin_pay_done":
-                result = container.order_flow.confirm_payment_manually(order_id=order_id)
-                if not result.updated or result.order is None:
-                    await callback.answer(f"Оплату нельзя подтвердить: {result.reason}", show_alert=True)
-                    return
-                updated = result.order
-                container.repository.log_admin_action(order_id, admin_id, admin_username, "PAYMENT_DONE")
-                await callback.message.answer(f"PAYMENT DONE: {updated['order_id']}")
-                await notify_payment_confirmed(container, bot, updated)
-
-            elif action == "admin_pay_retry":
-                if order["status"] != OrderStatus.WAIT_PAY.value:
-                    await callback.answer("Заказ уже не в статусе WAIT_PAY", show_alert=True)
-                    return
-                container.repository.log_admin_action(order_id, admin_id, admin_username, "PAYMENT_RETRY")
-                await bot.send_message(
-                    chat_id=int(order["tg_id"]),
-                    text=(
-                        "Не удалось подтвердить оплату по скриншоту.\n"
-                        "Проверьте перевод и пришлите новый скриншот."
-                    ),
-                    reply_markup=manual_payment_keyboard(order["order_id"]) if is_manual_payment_mode() else None,
-                )
-                await callback.message.answer(f"PAYMENT RETRY REQUESTED: {order['order_id']}")
+            text, show_alert = await handler(order, callback.from_user.id, callback.from_user.username)
+        except Exception as exc:
+            await callback.answer(f"Ошибка: {exc}", show_alert=True)
+            return
+        await callback.answer(text, show_alert=show_alert)
 
-            elif action == "admin_claim":
-                updated = container.repository.claim_order(order_id, admin_id, admin_username)
-                container.repository.log_admin_action(order_id, admin_id, admin_username, "CLAIM")
-                await callback.message.answer(
-                    f"CLAIM: {updated['order_id']} -> оператор @{admin_username or admin_id}"
-                )
+    return router
 
-            elif action == "admin_progress":
-                if order.get("operator_id") and int(order["operator_id"]) != admin_id:
-                    await callback.answer("Заказ занят другим оператором", show_alert=True)
-                    return
-                if not order.get("operator_id"):
-                    container.repository.claim_order(order_id, admin_id, admin_username)
-                updated = container.repository.set_order_in_progress(order_id)
-                container.repository.log_admin_action(order_id, admin_id, admin_username, "IN_PROGRESS")
-                await callback.message.answer(f"IN_PROGRESS: {updated['order_id']}")
-
-            elif action == "admin_done":
-                if order.get("operator_id") and int(order["operator_id"]) != admin_id:
-                    await callback.answer("Заказ занят другим оператором", show_alert=True)
-                    return
-                if order["status"] == OrderStatus.READY_FOR_OPERATOR.value:
-                    if not order.get("operator_id"):
-                        container.repository.claim_order(order_id, admin_id, admin_username)
-                    container.repository.set_order_in_progress(order_id)
-                updated = container.repository.mark_order_done(order_id)
-                container.repository.log_admin_action(order_id, admin_id, admin_username, "DONE")
-                await bot.send_message(
-                    chat_id=int(updated["tg_id"]),
-                    text=(
-                        "Готово ✅ Проверьте, что подписка активна.\n"
-                        "Нажмите одну кнопку ниже:"
-                    ),
-                    reply_markup=client_confirm_keyboard(updated["order_id"]),
-                )
-                await callback.message.answer(f"DONE: {updated['order_id']}")
 
-            elif action == "admin_error":
-                updated = container.repository.mark_order_error(
-                    order_id=order_id,
-                    error_code="OPERATOR_ERROR",
-                    error_text="Оператор отметил ошибку выполнения",
-                )
-                container.repository.log_admin_action(order_id, admin_id, admin_username, "ERROR")
-                await bot.send_message(
-                    chat_id=int(updated["tg_id"]),
-                    text=(
-                        "Не получилось завершить заказ.\n"
-                        "Оператор уже разбирается и свяжется с вами."
-                    ),
-                )
-                await callback.message.answer(f"ERROR: {updated['order_id']}")
+def _post_payment_guide_path(provider: str) -> Path | None:
+    provider_guide = POST_PAYMENT_PROVIDER_GUIDE_BY_PROVIDER.get(provider)
+    if provider_guide and provider_guide.exists():
+        return provider_guide
+    if provider in {"gpt", "claude", "cursor", "copilot"} and DEFAULT_POST_PAYMENT_GUIDE_PATH.exists():
+        return DEFAULT_POST_PAYMENT_GUIDE_PATH
+    return None
 
-            elif action == "admin_template":
-                product = container.products[order["product_code"]]
-                await bot.send_message(
-                    chat_id=int(order["tg_id"]),
-                    text=product.instruction_template,
-                )
-                container.repository.log_admin_action(order_id, admin_id, admin_username, "SEND_TEMPLATE")
-                await callback.message.answer(f"TEMPLATE SENT: {order['order_id']}")
-            else:
-                await callback.answer("Неизвестное действие", show_alert=True)
-                return
 
-        except Exception as exc:
-            await callback.answer(f"Ошибка: {exc}", show_alert=True)
-            return
+def _preload_guide_photo(path: Path) -> None:
+    if path not in GUIDE_PHOTOS:
+        GUIDE_PHOTOS[path] = BufferedInputFile(path.read_bytes(), filename=path.name)
 
-        await callback.answer()
 
-    return router
+def _preload_post_payment_guide(provider: str) -> None:
+    if provider not in POST_PAYMENT_GUIDE_PATHS:
+        guide_path = POST_PAYMENT_GUIDE_PATHS[provider] = _post_payment_guide_path(provider)
+        if guide_path is not None:
+            _preload_guide_photo(guide_path)
 
 
-async def notify_payment_confirmed(container: AppContainer, bot: Bot, order: dict[str, Any]) -> None:
-    product = container.products[order["product_code"]]
-    guide_path = None
-    if order["product_code"] not in {OPENROUTER_CODE, NANO_BANANA_CODE}:
-        provider_guide = POST_PAYMENT_PROVIDER_GUIDE_BY_PROVIDER.get(product.provider)
-        if provider_guide and provider_guide.exists():
-            guide_path = provider_guide
-        elif product.provider in {"gpt", "claude", "cursor", "copilot"} and DEFAULT_POST_PAYMENT_GUIDE_PATH.exists():
-            guide_path = DEFAULT_POST_PAYMENT_GUIDE_PATH
-    if guide_path is not None:
-        await bot.send_photo(
-            chat_id=int(order["tg_id"]),
-            photo=FSInputFile(str(guide_path)),
-        )
+def _guide_photo(path: Path) -> BufferedInputFile | str:
+    _preload_guide_photo(path)
+    return GUIDE_PHOTOS[path]
+
+
+def _remember_guide_file_id(path: Path, sent: Message | None) -> None:
+    if sent is not None and sent.photo and isinstance(GUIDE_PHOTOS.get(path), BufferedInputFile):
+        GUIDE_PHOTOS[path] = sent.photo[-1].file_id
+
+
+async def _send_post_payment_guide(bot: Bot, chat_id: int, provider: str) -> None:
+    _preload_post_payment_guide(provider)
+    guide_path = POST_PAYMENT_GUIDE_PATHS[provider]
+    if guide_path is None:
+        return
+    sent = await bot.send_photo(chat_id=chat_id, photo=_guide_photo(guide_path))
+    _remember_guide_file_id(guide_path, sent)
+
+
+async def _send_payment_confirmed_to_client(bot: Bot, order: dict[str, Any], product: Product) -> None:
+    if order["product_code"] not in VARIABLE_PRICE_PRODUCT_CODES:
+        await _send_post_payment_guide(bot, order["tg_id"], product.provider)
+    service_link_text = SERVICE_LINK_TEXTS.get(product.code)
+    if service_link_text is None:
+        service_link_text = SERVICE_LINK_TEXTS[product.code] = ask_service_link_text(product)
     await bot.send_message(
-        chat_id=int(order["tg_id"]),
-        text=ask_service_link_text(product),
+        chat_id=order["tg_id"],
+        text=service_link_text,
     )
-    await bot.send_message(
-        chat_id=container.settings.admin_chat_id,
-        text=admin_paid(order),
-        link_preview_options=LinkPreviewOptions(is_disabled=True),
+
+
+async def notify_payment_confirmed(container: AppContainer, bot: Bot, order: dict[str, Any]) -> None:
+    product = container.products[order["product_code"]]
+    await asyncio.gather(
+        _send_payment_confirmed_to_client(bot, order, product),
+        bot.send_message(
+            chat_id=container.settings.admin_chat_id,
+            text=admin_paid(order),
+            link_preview_options=NO_LINK_PREVIEW,
+        ),
     )
 
 
@@ -1356,16 +1459,20 @@ async def send_renew_reminder(container: AppContainer, bot: Bot, tg_id: int, pro
     product = container.products.get(product_code)
     if product is None:
         return
-    if days_left <= 0:
-        text = (
-            f"Подписка {product.name} истекает сегодня.\n"
-            "Нажмите кнопку, чтобы продлить."
-        )
-    else:
-        text = (
-            f"До окончания подписки {product.name} осталось {days_left} дня.\n"
-            "Нажмите кнопку, чтобы продлить."
-        )
+    days_left = max(days_left, 0)
+    text = RENEW_REMINDER_TEXTS.get((product_code, days_left))
+    if text is None:
+        if days_left == 0:
+            text = (
+                f"Подписка {product.name} истекает сегодня.\n"
+                "Нажмите кнопку, чтобы продлить."
+            )
+        else:
+            text = (
+                f"До окончания подписки {product.name} осталось {days_left} дня.\n"
+                "Нажмите кнопку, чтобы продлить."
+            )
+        RENEW_REMINDER_TEXTS[(product_code, days_left)] = text
     await bot.send_message(
         chat_id=tg_id,
         text=text,
@@ -1,15 +1,20 @@
 from __future__ import annotations
 
+from functools import lru_cache
+from typing import Collection, Iterable
+
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
 from app.products import PROVIDER_ORDER, PROVIDER_TITLES, Product
 
 
-def provider_picker_keyboard(products: dict[str, Product]) -> InlineKeyboardMarkup:
-    available = {product.provider for product in products.values() if not product.hidden}
+KEYBOARD_CACHE_SIZE = 512
+
+
+def provider_picker_keyboard(providers: Collection[str]) -> InlineKeyboardMarkup:
     rows: list[list[InlineKeyboardButton]] = []
     for provider in PROVIDER_ORDER:
-        if provider not in available:
+        if provider not in providers:
             continue
         rows.append(
             [
@@ -23,30 +28,25 @@ def provider_picker_keyboard(products: dict[str, Product]) -> InlineKeyboardMark
 
 
 def product_picker_keyboard(
-    products: dict[str, Product],
+    products: Iterable[Product],
     *,
-    provider: str | None = None,
     include_back: bool = False,
 ) -> InlineKeyboardMarkup:
-    rows: list[list[InlineKeyboardButton]] = []
-    for code, product in products.items():
-        if product.hidden:
-            continue
-        if provider and product.provider != provider:
-            continue
-        rows.append(
-            [
-                InlineKeyboardButton(
-                    text=f"{product.name} - {product.price_label()}",
-                    callback_data=f"product:{code}",
-                )
-            ]
-        )
+    rows: list[list[InlineKeyboardButton]] = [
+        [
+            InlineKeyboardButton(
+                text=f"{product.name} - {product.price_label()}",
+                callback_data=f"product:{product.code}",
+            )
+        ]
+        for product in products
+    ]
     if include_back:
         rows.append([InlineKeyboardButton(text="⬅️ Назад", callback_data="providers")])
     return InlineKeyboardMarkup(inline_keyboard=rows)
 
 
+@lru_cache(maxsize=KEYBOARD_CACHE_SIZE)
 def confirm_product_keyboard(product_code: str) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(
         inline_keyboard=[
@@ -69,17 +69,11 @@ def manual_payment_keyboard(order_id: str) -> InlineKeyboardMarkup:
     )
 
 
-def payment_test_confirm_keyboard(order_id: str) -> InlineKeyboardMarkup:
-    return InlineKeyboardMarkup(
-        inline_keyboard=[
-            [InlineKeyboardButton(text="🧪 Симулировать оплату", callback_data=f"test_paid:{order_id}")]
-        ]
-    )
-
-
-def payment_test_fail_keyboard(order_id: str) -> InlineKeyboardMarkup:
+def payment_test_keyboard(payment_url: str, order_id: str) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(
         inline_keyboard=[
+            [InlineKeyboardButton(text="💳 Оплатить", url=payment_url)],
+            [InlineKeyboardButton(text="🧪 Симулировать оплату", callback_data=f"test_paid:{order_id}")],
             [InlineKeyboardButton(text="🧪 Тест отказа оплаты", callback_data=f"test_fail:{order_id}")],
         ]
     )
@@ -133,6 +127,7 @@ def admin_payment_proof_keyboard(order_id: str) -> InlineKeyboardMarkup:
     )
 
 
+@lru_cache(maxsize=KEYBOARD_CACHE_SIZE)
 def renew_keyboard(product_code: str) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(
         inline_keyboard=[
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING, Any, Callable
+
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+
+from app.cache import TTLCache
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_SEND_RATE_PER_SECOND = 25.0
+GLOBAL_SEND_BURST = 25
+PRIVATE_CHAT_RATE_PER_SECOND = 1.0
+PRIVATE_CHAT_BURST = 3
+GROUP_CHAT_RATE_PER_SECOND = 20 / 60
+GROUP_CHAT_BURST = 5
+CHAT_BUCKETS_MAX = 10_000
+CHAT_BUCKET_IDLE_SECONDS = 60.0
+MAX_RETRY_AFTER_SECONDS = 30
+
+
+class TokenBucket:
+    def __init__(self, *, rate: float, burst: int, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated_at = clock()
+        self.saturated = 0
+
+    def reserve(self) -> float:
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+        self._tokens -= 1
+        if self._tokens < -self.burst:
+            self.saturated += 1
+        return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+class OutgoingRateLimitMiddleware(BaseRequestMiddleware):
+    def __init__(self) -> None:
+        self._global = TokenBucket(rate=GLOBAL_SEND_RATE_PER_SECOND, burst=GLOBAL_SEND_BURST)
+        self._chats: TTLCache[Any, TokenBucket] = TTLCache(
+            maxsize=CHAT_BUCKETS_MAX,
+            ttl_seconds=CHAT_BUCKET_IDLE_SECONDS,
+        )
+
+    def _chat_bucket(self, chat_id: Any) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if isinstance(chat_id, int) and chat_id > 0:
+                bucket = TokenBucket(rate=PRIVATE_CHAT_RATE_PER_SECOND, burst=PRIVATE_CHAT_BURST)
+            else:
+                bucket = TokenBucket(rate=GROUP_CHAT_RATE_PER_SECOND, burst=GROUP_CHAT_BURST)
+        self._chats.set(chat_id, bucket)
+        return bucket
+
+    def _reserve(self, chat_id: Any) -> float:
+        bucket = self._chat_bucket(chat_id)
+        saturated = bucket.saturated + self._global.saturated
+        delay = max(bucket.reserve(), self._global.reserve())
+        if bucket.saturated + self._global.saturated > saturated:
+            logger.warning("Outgoing rate limit saturated for chat %s, delaying %.1fs", chat_id, delay)
+        return delay
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        chat_id = getattr(method, "chat_id", None)
+        if chat_id is None:
+            return await make_request(bot, method)
+
+        delay = self._reserve(chat_id)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        try:
+            return await make_request(bot, method)
+        except TelegramRetryAfter as exc:
+            if exc.retry_after > MAX_RETRY_AFTER_SECONDS:
+                raise
+            await asyncio.sleep(max(exc.retry_after, self._reserve(chat_id)))
+            return await make_request(bot, method)
@@ -2,6 +2,34 @@ from __future__ import annotations
 
 from app.products import Product
 
+ORDER_FOLLOW_UP_TEMPLATE = (
+    "Заказ {order_id} отслеживается автоматически.\n"
+    "Если нужно, проверьте вручную: /status {order_id}\n\n"
+    "Если хотите отменить до подтверждения оплаты: /cancel {order_id}"
+)
+MANUAL_ORDER_FOLLOW_UP_TEMPLATE = ORDER_FOLLOW_UP_TEMPLATE + "\n\nПосле оплаты пришлите скриншот в этот чат."
+TEST_ORDER_FOLLOW_UP_TEMPLATE = (
+    ORDER_FOLLOW_UP_TEMPLATE + "\n\nТестовый шаг: симулируйте успешную или неуспешную оплату кнопками ниже."
+)
+OPEN_ORDER_TEMPLATE = (
+    "У вас уже есть незакрытый заказ.\n"
+    "Order ID: {order_id}\n"
+    "Статус: {status}\n"
+    "Комментарий: {status_hint}\n\n"
+    "Новый заказ можно создать после закрытия текущего.\n"
+    "Проверьте статус: /status {order_id}\n"
+    "Если нужна помощь: /operator"
+)
+ACTIVE_PRODUCT_ORDER_TEMPLATE = (
+    "У вас уже есть активный заказ по этому продукту.\n"
+    "Order ID: {order_id}\n"
+    "Статус: {status_hint}"
+)
+DAILY_ORDER_LIMIT_TEMPLATE = (
+    "Лимит создания заказов: {limit} в сутки.\n"
+    "Попробуйте завтра или напишите оператору: /operator"
+)
+
 HELP_LINKS_BY_PROVIDER: dict[str, str] = {
     "claude": "https://rus-bridge.ru/help-claude.html",
     "cursor": "https://rus-bridge.ru/help-ide.html",
@@ -65,6 +93,36 @@ def order_wait_pay_text(
     )
 
 
+def order_created_text(
+    product: Product,
+    order_id: str,
+    payment_mode: str,
+    payment_test_mode: bool,
+    *,
+    price_rub: int | None = None,
+) -> str:
+    wait_pay_text = order_wait_pay_text(product, order_id, payment_mode, payment_test_mode, price_rub=price_rub)
+    if payment_mode == "manual":
+        follow_up = MANUAL_ORDER_FOLLOW_UP_TEMPLATE
+    elif payment_test_mode:
+        follow_up = TEST_ORDER_FOLLOW_UP_TEMPLATE
+    else:
+        follow_up = ORDER_FOLLOW_UP_TEMPLATE
+    return f"{wait_pay_text}\n\n{follow_up.format(order_id=order_id)}"
+
+
+def open_order_text(order_id: str, status: str, status_hint: str) -> str:
+    return OPEN_ORDER_TEMPLATE.format(order_id=order_id, status=status, status_hint=status_hint)
+
+
+def active_product_order_text(order_id: str, status_hint: str) -> str:
+    return ACTIVE_PRODUCT_ORDER_TEMPLATE.format(order_id=order_id, status_hint=status_hint)
+
+
+def daily_order_limit_text(limit: int) -> str:
+    return DAILY_ORDER_LIMIT_TEMPLATE.format(limit=limit)
+
+
 def manual_payment_details_text(
     *,
     order_id: str,
@@ -135,3 +193,31 @@ def admin_link_received(order: dict) -> str:
         f"Ссылка: {order['service_link']}\n"
         f"Статус: {order['status']}"
     )
+
+
+def admin_operator_request(username: str | None, tg_id: int) -> str:
+    return (
+        "CLIENT NEEDS OPERATOR\n"
+        f"Пользователь: @{username or 'без_username'} (id: {tg_id})"
+    )
+
+
+def admin_order_cancelled(order: dict) -> str:
+    return f"ORDER CANCELLED\nOrder ID: {order['order_id']}"
+
+
+def admin_client_confirmed(order: dict, end_date: str) -> str:
+    return (
+        "CLIENT CONFIRMED\n"
+        f"Order ID: {order['order_id']}\n"
+        f"Продукт: {order['product_name']}\n"
+        f"Подписка активна до: {end_date}"
+    )
+
+
+def admin_client_issue(order: dict) -> str:
+    return (
+        "CLIENT REPORTED ISSUE\n"
+        f"Order ID: {order['order_id']}\n"
+        f"Ошибка: {order['error_text']}"
+    )
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, TypeVar
+
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class TTLCache(Generic[K, V]):
+    def __init__(
+        self,
+        *,
+        maxsize: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._items: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def get(self, key: K, default: V | None = None) -> V | None:
+        item = self._items.get(key)
+        if item is None:
+            return default
+        expires_at, value = item
+        if expires_at <= self._clock():
+            del self._items[key]
+            return default
+        self._items.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        self._items[key] = (self._clock() + self.ttl_seconds, value)
+        self._items.move_to_end(key)
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+    def pop(self, key: K, default: V | None = None) -> V | None:
+        item = self._items.pop(key, None)
+        if item is None:
+            return default
+        expires_at, value = item
+        return value if expires_at > self._clock() else default
+
+    def clear(self) -> None:
+        self._items.clear()
+
+    def __contains__(self, key: object) -> bool:
+        return self.get(key, _MISSING) is not _MISSING  # type: ignore[arg-type]
+
+    def __len__(self) -> int:
+        return len(self._items)
@@ -56,6 +56,7 @@ CREATE INDEX IF NOT EXISTS idx_orders_tg_id ON orders(tg_id);
 CREATE INDEX IF NOT EXISTS idx_orders_status ON orders(status);
 CREATE INDEX IF NOT EXISTS idx_orders_payment_inv_id ON orders(payment_inv_id);
 CREATE INDEX IF NOT EXISTS idx_orders_created_at ON orders(created_at);
+CREATE INDEX IF NOT EXISTS idx_orders_tg_id_status_created_at ON orders(tg_id, status, created_at);
 
 CREATE UNIQUE INDEX IF NOT EXISTS idx_orders_one_active_per_service
 ON orders(tg_id, product_code)
@@ -97,5 +98,6 @@ CREATE TABLE IF NOT EXISTS events_log (
 def init_db(database_path: str) -> None:
     Path(database_path).parent.mkdir(parents=True, exist_ok=True)
     with sqlite3.connect(database_path) as conn:
+        conn.execute("PRAGMA journal_mode = WAL;")
         conn.executescript(SCHEMA)
         conn.commit()
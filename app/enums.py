@@ -18,7 +18,7 @@ class OrderStatus(StrEnum):
     CANCELLED = "CANCELLED"
 
 
-ACTIVE_ORDER_STATUSES = {
+ACTIVE_ORDER_STATUSES = frozenset({
     OrderStatus.NEW.value,
     OrderStatus.WAIT_PAY.value,
     OrderStatus.PAID.value,
@@ -27,13 +27,24 @@ ACTIVE_ORDER_STATUSES = {
     OrderStatus.IN_PROGRESS.value,
     OrderStatus.DONE.value,
     OrderStatus.WAIT_CLIENT_CONFIRM.value,
-}
+})
 
 
-TERMINAL_ORDER_STATUSES = {
+PAID_ORDER_STATUSES = frozenset({
+    OrderStatus.PAID.value,
+    OrderStatus.WAIT_SERVICE_LINK.value,
+    OrderStatus.READY_FOR_OPERATOR.value,
+    OrderStatus.IN_PROGRESS.value,
+    OrderStatus.DONE.value,
+    OrderStatus.WAIT_CLIENT_CONFIRM.value,
+    OrderStatus.CLIENT_CONFIRMED.value,
+})
+
+
+TERMINAL_ORDER_STATUSES = frozenset({
     OrderStatus.CLIENT_CONFIRMED.value,
     OrderStatus.ERROR.value,
     OrderStatus.EXPIRED.value,
     OrderStatus.CANCELLED.value,
-}
+})
 
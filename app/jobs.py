@@ -32,7 +32,7 @@ def build_scheduler(container: AppContainer, bot: Bot) -> AsyncIOScheduler:
             except TransitionError:
                 continue
             await bot.send_message(
-                chat_id=int(expired["tg_id"]),
+                chat_id=expired["tg_id"],
                 text=(
                     f"Заказ {expired['order_id']} истёк по таймауту оплаты.\n"
                     "Если актуально, начните оформление заново через /start."
@@ -57,7 +57,7 @@ def build_scheduler(container: AppContainer, bot: Bot) -> AsyncIOScheduler:
             except TransitionError:
                 continue
             await bot.send_message(
-                chat_id=int(expired["tg_id"]),
+                chat_id=expired["tg_id"],
                 text=(
                     f"Заказ {expired['order_id']} истёк: не получили ссылку вовремя.\n"
                     "Можно начать заново через /start."
@@ -79,7 +79,7 @@ def build_scheduler(container: AppContainer, bot: Bot) -> AsyncIOScheduler:
                 await send_renew_reminder(
                     container=container,
                     bot=bot,
-                    tg_id=int(row["tg_id"]),
+                    tg_id=row["tg_id"],
                     product_code=row["product_code"],
                     days_left=days_left,
                 )
@@ -89,7 +89,7 @@ def build_scheduler(container: AppContainer, bot: Bot) -> AsyncIOScheduler:
                 await send_renew_reminder(
                     container=container,
                     bot=bot,
-                    tg_id=int(row["tg_id"]),
+                    tg_id=row["tg_id"],
                     product_code=row["product_code"],
                     days_left=days_left,
                 )
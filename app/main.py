@@ -2,16 +2,37 @@ from __future__ import annotations
 
 import asyncio
 import logging
+from typing import Any
 
+import orjson
 import uvicorn
 from aiogram import Bot, Dispatcher
+from aiogram.client.session.aiohttp import AiohttpSession
 
 from app.api import create_api
 from app.bot.handlers import build_router
+from app.bot.rate_limit import OutgoingRateLimitMiddleware
 from app.jobs import build_scheduler
 from app.runtime import build_container
 
 
+BOT_HTTP_CONNECTION_LIMIT = 100
+
+
+def _orjson_dumps(value: Any) -> str:
+    return orjson.dumps(value).decode("utf-8")
+
+
+def build_bot_session() -> AiohttpSession:
+    session = AiohttpSession(
+        limit=BOT_HTTP_CONNECTION_LIMIT,
+        json_loads=orjson.loads,
+        json_dumps=_orjson_dumps,
+    )
+    session.middleware(OutgoingRateLimitMiddleware())
+    return session
+
+
 async def run() -> None:
     logging.basicConfig(
         level=logging.INFO,
@@ -19,18 +40,22 @@ async def run() -> None:
     )
 
     container = build_container()
-    bot = Bot(token=container.settings.bot_token)
+    bot = Bot(token=container.settings.bot_token, session=build_bot_session())
     dispatcher = Dispatcher()
     dispatcher.include_router(build_router(container=container, bot=bot))
 
     scheduler = build_scheduler(container, bot)
     scheduler.start()
+    event_log_task = asyncio.create_task(container.event_log.run())
+    admin_log_task = asyncio.create_task(container.admin_log.run())
+    outbox_task = asyncio.create_task(container.outbox.run())
 
     api = create_api(container=container, bot=bot)
     config = uvicorn.Config(
         app=api,
         host=container.settings.web_host,
         port=container.settings.web_port,
+        http="httptools",
         log_level="info",
     )
     server = uvicorn.Server(config=config)
@@ -48,6 +73,13 @@ async def run() -> None:
         task.cancel()
 
     scheduler.shutdown(wait=False)
+    event_log_task.cancel()
+    admin_log_task.cancel()
+    outbox_task.cancel()
+    await asyncio.gather(event_log_task, admin_log_task, outbox_task, return_exceptions=True)
+    await container.outbox.flush_pending()
+    container.event_log.flush_pending()
+    container.admin_log.flush_pending()
     await bot.session.close()
 
     for task in done:
@@ -59,4 +91,9 @@ async def run() -> None:
 
 
 if __name__ == "__main__":
-    asyncio.run(run())
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(run())
+    else:
+        uvloop.run(run())
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
-import json
 from dataclasses import dataclass
 from pathlib import Path
 
+import orjson
+
 
 PROVIDER_ORDER = ("gpt", "openrouter", "nano", "midjourney", "claude", "cursor", "copilot", "other")
 PROVIDER_TITLES: dict[str, str] = {
@@ -46,7 +47,7 @@ class Product:
     requirements: list[str]
     service_link_prompt: str
     instruction_template: str
-    allowed_domains: list[str]
+    allowed_domains: frozenset[str]
     hidden: bool
 
     def price_label(self) -> str:
@@ -56,8 +57,7 @@ class Product:
 
 
 def load_products(path: str) -> dict[str, Product]:
-    content = Path(path).read_text(encoding="utf-8")
-    payload = json.loads(content)
+    payload = orjson.loads(Path(path).read_bytes())
     result: dict[str, Product] = {}
     for raw in payload:
         item = Product(
@@ -70,8 +70,16 @@ def load_products(path: str) -> dict[str, Product]:
             requirements=list(raw.get("requirements", [])),
             service_link_prompt=raw.get("service_link_prompt", "Пришлите ссылку на оплату сервиса."),
             instruction_template=raw.get("instruction_template", "Инструкции отправит оператор."),
-            allowed_domains=list(raw.get("allowed_domains", [])),
+            allowed_domains=frozenset(domain.lower() for domain in raw.get("allowed_domains", [])),
             hidden=bool(raw.get("hidden", False)),
         )
         result[item.code] = item
     return result
+
+
+def group_visible_products(products: dict[str, Product]) -> dict[str, list[Product]]:
+    grouped: dict[str, list[Product]] = {}
+    for product in products.values():
+        if not product.hidden:
+            grouped.setdefault(product.provider, []).append(product)
+    return grouped
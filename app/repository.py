@@ -1,17 +1,48 @@
 from __future__ import annotations
 
-import json
 import secrets
 import sqlite3
 import threading
 from dataclasses import dataclass
 from datetime import date, datetime, timedelta, timezone
-from typing import Any
+from functools import cache
+from typing import Any, Sequence
 
+import orjson
+
+from app.cache import TTLCache
 from app.enums import ACTIVE_ORDER_STATUSES, OrderStatus
 from app.state_machine import TransitionError, ensure_transition
 
 
+ORDER_CACHE_SIZE = 4096
+ORDER_CACHE_TTL_SECONDS = 30.0
+ORDER_ID_BY_INV_ID_TTL_SECONDS = 3600.0
+USER_BLOCK_CACHE_SIZE = 10_000
+USER_BLOCK_CACHE_TTL_SECONDS = 60.0
+ACTIVE_STATUS_VALUES = tuple(sorted(ACTIVE_ORDER_STATUSES))
+EMPTY_METADATA_JSON = orjson.dumps({}).decode("utf-8")
+STATEMENT_CACHE_SIZE = 256
+GET_ORDER_SQL = "SELECT * FROM orders WHERE order_id = ? LIMIT 1"
+GET_ORDER_ID_BY_INV_ID_SQL = "SELECT order_id FROM orders WHERE payment_inv_id = ? LIMIT 1"
+LATEST_ACTIVE_ORDER_SQL = f"""
+SELECT * FROM orders
+WHERE tg_id = ? AND status IN ({",".join("?" * len(ACTIVE_STATUS_VALUES))})
+ORDER BY created_at DESC
+LIMIT 1
+"""
+LATEST_ACTIVE_PRODUCT_ORDER_SQL = f"""
+SELECT * FROM orders
+WHERE tg_id = ? AND product_code = ?
+  AND status IN ({",".join("?" * len(ACTIVE_STATUS_VALUES))})
+ORDER BY created_at DESC
+LIMIT 1
+"""
+
+
+_NOT_CACHED = object()
+
+
 def utcnow() -> datetime:
     return datetime.now(tz=timezone.utc)
 
@@ -20,6 +51,11 @@ def iso_now() -> str:
     return utcnow().isoformat()
 
 
+@cache
+def _placeholders(count: int) -> str:
+    return ",".join("?" * count)
+
+
 def _row_to_dict(row: sqlite3.Row | None) -> dict[str, Any] | None:
     if row is None:
         return None
@@ -63,11 +99,32 @@ class Repository:
     def __init__(self, database_path: str):
         self.database_path = database_path
         self._lock = threading.Lock()
+        self._local = threading.local()
+        self._order_cache_lock = threading.Lock()
+        self._order_cache: TTLCache[str, dict[str, Any]] = TTLCache(
+            maxsize=ORDER_CACHE_SIZE,
+            ttl_seconds=ORDER_CACHE_TTL_SECONDS,
+        )
+        self._order_ids_by_inv_id: TTLCache[int, str] = TTLCache(
+            maxsize=ORDER_CACHE_SIZE,
+            ttl_seconds=ORDER_ID_BY_INV_ID_TTL_SECONDS,
+        )
+        self._order_fills: dict[str, object] = {}
+        self._user_block_cache_lock = threading.Lock()
+        self._user_blocks: TTLCache[int, dict[str, Any] | None] = TTLCache(
+            maxsize=USER_BLOCK_CACHE_SIZE,
+            ttl_seconds=USER_BLOCK_CACHE_TTL_SECONDS,
+        )
+        self._user_block_fills: dict[int, object] = {}
 
     def _connect(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.database_path)
-        conn.row_factory = sqlite3.Row
-        conn.execute("PRAGMA foreign_keys = ON;")
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.database_path, cached_statements=STATEMENT_CACHE_SIZE)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA foreign_keys = ON;")
+            conn.execute("PRAGMA synchronous = NORMAL;")
+            self._local.conn = conn
         return conn
 
     def upsert_user(self, tg_id: int, username: str | None, source_key: str | None) -> None:
@@ -86,50 +143,63 @@ class Repository:
             )
             conn.commit()
 
+    def _cache_order(self, order: dict[str, Any]) -> None:
+        with self._order_cache_lock:
+            self._order_fills.pop(order["order_id"], None)
+            self._order_cache.set(order["order_id"], order)
+
+    def _forget_order(self, order_id: str) -> None:
+        with self._order_cache_lock:
+            self._order_fills.pop(order_id, None)
+            self._order_cache.pop(order_id)
+
+    def _finish_order_fill(self, order_id: str, fill: object, order: dict[str, Any] | None) -> None:
+        with self._order_cache_lock:
+            if self._order_fills.get(order_id) is not fill:
+                return
+            del self._order_fills[order_id]
+            if order is not None:
+                self._order_cache.set(order_id, dict(order))
+
     def get_order(self, order_id: str) -> dict[str, Any] | None:
-        with self._connect() as conn:
-            row = conn.execute(
-                "SELECT * FROM orders WHERE order_id = ? LIMIT 1",
-                (order_id,),
-            ).fetchone()
-            return _row_to_dict(row)
+        fill = object()
+        with self._order_cache_lock:
+            cached = self._order_cache.get(order_id)
+            if cached is None:
+                self._order_fills[order_id] = fill
+        if cached is not None:
+            return dict(cached)
+        order = None
+        try:
+            with self._connect() as conn:
+                order = _row_to_dict(conn.execute(GET_ORDER_SQL, (order_id,)).fetchone())
+        finally:
+            self._finish_order_fill(order_id, fill, order)
+        return order
 
     def get_order_by_payment_inv_id(self, inv_id: int) -> dict[str, Any] | None:
+        with self._order_cache_lock:
+            order_id = self._order_ids_by_inv_id.get(inv_id)
+        if order_id is not None:
+            return self.get_order(order_id)
         with self._connect() as conn:
-            row = conn.execute(
-                "SELECT * FROM orders WHERE payment_inv_id = ? LIMIT 1",
-                (inv_id,),
-            ).fetchone()
-            return _row_to_dict(row)
+            row = conn.execute(GET_ORDER_ID_BY_INV_ID_SQL, (inv_id,)).fetchone()
+        if row is None:
+            return None
+        with self._order_cache_lock:
+            self._order_ids_by_inv_id.set(inv_id, row["order_id"])
+        return self.get_order(row["order_id"])
 
     def find_active_order_any(self, tg_id: int) -> dict[str, Any] | None:
-        placeholders = ",".join("?" for _ in ACTIVE_ORDER_STATUSES)
-        statuses = tuple(sorted(ACTIVE_ORDER_STATUSES))
         with self._connect() as conn:
-            row = conn.execute(
-                f"""
-                SELECT * FROM orders
-                WHERE tg_id = ? AND status IN ({placeholders})
-                ORDER BY created_at DESC
-                LIMIT 1
-                """,
-                (tg_id, *statuses),
-            ).fetchone()
+            row = conn.execute(LATEST_ACTIVE_ORDER_SQL, (tg_id, *ACTIVE_STATUS_VALUES)).fetchone()
             return _row_to_dict(row)
 
     def find_active_order(self, tg_id: int, product_code: str) -> dict[str, Any] | None:
-        placeholders = ",".join("?" for _ in ACTIVE_ORDER_STATUSES)
-        statuses = tuple(sorted(ACTIVE_ORDER_STATUSES))
         with self._connect() as conn:
             row = conn.execute(
-                f"""
-                SELECT * FROM orders
-                WHERE tg_id = ? AND product_code = ?
-                  AND status IN ({placeholders})
-                ORDER BY created_at DESC
-                LIMIT 1
-                """,
-                (tg_id, product_code, *statuses),
+                LATEST_ACTIVE_PRODUCT_ORDER_SQL,
+                (tg_id, product_code, *ACTIVE_STATUS_VALUES),
             ).fetchone()
             return _row_to_dict(row)
 
@@ -145,18 +215,24 @@ class Repository:
             ).fetchone()
             return int(row["count_value"]) if row is not None else 0
 
-    def list_orders_by_user_and_statuses(self, tg_id: int, statuses: list[str]) -> list[dict[str, Any]]:
+    def list_orders_by_user_and_statuses(
+        self,
+        tg_id: int,
+        statuses: Sequence[str],
+        limit: int = -1,
+    ) -> list[dict[str, Any]]:
         if not statuses:
             return []
-        placeholders = ",".join("?" for _ in statuses)
+        placeholders = _placeholders(len(statuses))
         with self._connect() as conn:
             rows = conn.execute(
                 f"""
                 SELECT * FROM orders
                 WHERE tg_id = ? AND status IN ({placeholders})
                 ORDER BY created_at DESC
+                LIMIT ?
                 """,
-                (tg_id, *statuses),
+                (tg_id, *statuses, limit),
             ).fetchall()
             return [_row_to_dict(row) for row in rows if row is not None]
 
@@ -185,21 +261,11 @@ class Repository:
             now.isoformat(),
             now.isoformat(),
             expires_at,
-            json.dumps({}),
+            EMPTY_METADATA_JSON,
         )
 
-        statuses = tuple(sorted(ACTIVE_ORDER_STATUSES))
-        placeholders = ",".join("?" for _ in statuses)
         with self._lock, self._connect() as conn:
-            existing_row = conn.execute(
-                f"""
-                SELECT * FROM orders
-                WHERE tg_id = ? AND status IN ({placeholders})
-                ORDER BY created_at DESC
-                LIMIT 1
-                """,
-                (tg_id, *statuses),
-            ).fetchone()
+            existing_row = conn.execute(LATEST_ACTIVE_ORDER_SQL, (tg_id, *ACTIVE_STATUS_VALUES)).fetchone()
             if existing_row is not None:
                 existing = _row_to_dict(existing_row)
                 assert existing is not None
@@ -243,13 +309,38 @@ class Repository:
         assert created is not None
         return created
 
+    def _forget_user_block(self, tg_id: int) -> None:
+        with self._user_block_cache_lock:
+            self._user_block_fills.pop(tg_id, None)
+            self._user_blocks.pop(tg_id)
+
+    def _finish_user_block_fill(self, tg_id: int, fill: object, block: Any) -> None:
+        with self._user_block_cache_lock:
+            if self._user_block_fills.get(tg_id) is not fill:
+                return
+            del self._user_block_fills[tg_id]
+            if block is not _NOT_CACHED:
+                self._user_blocks.set(tg_id, dict(block) if block is not None else None)
+
     def get_user_block(self, tg_id: int) -> dict[str, Any] | None:
-        with self._connect() as conn:
-            row = conn.execute(
-                "SELECT * FROM blocked_users WHERE tg_id = ? LIMIT 1",
-                (tg_id,),
-            ).fetchone()
-            return _row_to_dict(row)
+        fill = object()
+        with self._user_block_cache_lock:
+            cached = self._user_blocks.get(tg_id, _NOT_CACHED)
+            if cached is _NOT_CACHED:
+                self._user_block_fills[tg_id] = fill
+        if cached is not _NOT_CACHED:
+            return dict(cached) if cached is not None else None
+        block: Any = _NOT_CACHED
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT * FROM blocked_users WHERE tg_id = ? LIMIT 1",
+                    (tg_id,),
+                ).fetchone()
+            block = _row_to_dict(row)
+        finally:
+            self._finish_user_block_fill(tg_id, fill, block)
+        return block
 
     def is_user_blocked(self, tg_id: int) -> bool:
         return self.get_user_block(tg_id) is not None
@@ -269,6 +360,7 @@ class Repository:
                 (tg_id, reason, blocked_by, now, now),
             )
             conn.commit()
+        self._forget_user_block(tg_id)
 
     def unblock_user(self, tg_id: int) -> None:
         with self._lock, self._connect() as conn:
@@ -277,6 +369,7 @@ class Repository:
                 (tg_id,),
             )
             conn.commit()
+        self._forget_user_block(tg_id)
 
     def update_payment_fields(
         self,
@@ -296,6 +389,35 @@ class Repository:
                 (out_sum, payment_status_text, iso_now(), order_id),
             )
             conn.commit()
+            self._forget_order(order_id)
+
+    def _transition_in(
+        self,
+        conn: sqlite3.Connection,
+        order_id: str,
+        target_status: str,
+        fields: dict[str, Any] | None,
+    ) -> tuple[sqlite3.Row, bool]:
+        row = conn.execute(GET_ORDER_SQL, (order_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"Order not found: {order_id}")
+
+        current_status = row["status"]
+        if current_status == target_status and not fields:
+            return row, False
+        ensure_transition(current=current_status, target=target_status)
+
+        updates: dict[str, Any] = fields.copy() if fields else {}
+        updates["status"] = target_status
+        updates["updated_at"] = iso_now()
+
+        set_clause = ", ".join(f"{key} = ?" for key in updates.keys())
+        values = list(updates.values()) + [order_id]
+        updated = conn.execute(
+            f"UPDATE orders SET {set_clause} WHERE order_id = ? RETURNING *",
+            values,
+        ).fetchone()
+        return updated, True
 
     def transition_order(
         self,
@@ -305,50 +427,17 @@ class Repository:
         fields: dict[str, Any] | None = None,
     ) -> dict[str, Any]:
         with self._lock, self._connect() as conn:
-            row = conn.execute(
-                "SELECT * FROM orders WHERE order_id = ? LIMIT 1",
-                (order_id,),
-            ).fetchone()
-            if row is None:
-                raise KeyError(f"Order not found: {order_id}")
-
-            current_status = row["status"]
-            try:
-                ensure_transition(current=current_status, target=target_status)
-            except TransitionError:
-                if current_status == target_status:
-                    result = _row_to_dict(row)
-                    assert result is not None
-                    return result
-                raise
-
-            updates: dict[str, Any] = fields.copy() if fields else {}
-            updates["status"] = target_status
-            updates["updated_at"] = iso_now()
-
-            set_clause = ", ".join(f"{key} = ?" for key in updates.keys())
-            values = list(updates.values()) + [order_id]
-            conn.execute(
-                f"UPDATE orders SET {set_clause} WHERE order_id = ?",
-                values,
-            )
-            conn.commit()
-
-            updated = conn.execute(
-                "SELECT * FROM orders WHERE order_id = ? LIMIT 1",
-                (order_id,),
-            ).fetchone()
-
-        result = _row_to_dict(updated)
-        assert result is not None
+            row, changed = self._transition_in(conn, order_id, target_status, fields)
+            if changed:
+                conn.commit()
+            result = _row_to_dict(row)
+            assert result is not None
+            self._cache_order(dict(result))
         return result
 
     def claim_order(self, order_id: str, operator_id: int, operator_username: str | None) -> dict[str, Any]:
         with self._lock, self._connect() as conn:
-            row = conn.execute(
-                "SELECT * FROM orders WHERE order_id = ? LIMIT 1",
-                (order_id,),
-            ).fetchone()
+            row = conn.execute(GET_ORDER_SQL, (order_id,)).fetchone()
             if row is None:
                 raise KeyError(f"Order not found: {order_id}")
 
@@ -370,11 +459,48 @@ class Repository:
             fields=fields,
         )
 
-    def set_order_in_progress(self, order_id: str) -> dict[str, Any]:
-        return self.transition_order(
-            order_id=order_id,
-            target_status=OrderStatus.IN_PROGRESS.value,
-        )
+    def set_order_in_progress(
+        self,
+        order_id: str,
+        operator_id: int | None = None,
+        operator_username: str | None = None,
+    ) -> dict[str, Any]:
+        if operator_id is None:
+            return self.transition_order(
+                order_id=order_id,
+                target_status=OrderStatus.IN_PROGRESS.value,
+            )
+
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT status, operator_id FROM orders WHERE order_id = ? LIMIT 1",
+                (order_id,),
+            ).fetchone()
+            if row is None:
+                raise KeyError(f"Order not found: {order_id}")
+            if row["operator_id"] and row["operator_id"] != operator_id:
+                raise PermissionError("Order is already claimed by another operator.")
+            ensure_transition(current=row["status"], target=OrderStatus.IN_PROGRESS.value)
+
+            now = iso_now()
+            updated = conn.execute(
+                """
+                UPDATE orders
+                SET operator_id = ?,
+                    operator_username = CASE WHEN operator_id IS NULL THEN ? ELSE operator_username END,
+                    claimed_at = COALESCE(claimed_at, ?),
+                    status = ?,
+                    updated_at = ?
+                WHERE order_id = ?
+                RETURNING *
+                """,
+                (operator_id, operator_username, now, OrderStatus.IN_PROGRESS.value, now, order_id),
+            ).fetchone()
+            conn.commit()
+            result = _row_to_dict(updated)
+            assert result is not None
+            self._cache_order(dict(result))
+        return result
 
     def set_service_link_ready(self, order_id: str, service_link: str) -> dict[str, Any]:
         return self.transition_order(
@@ -386,16 +512,32 @@ class Repository:
             },
         )
 
-    def mark_order_done(self, order_id: str) -> dict[str, Any]:
-        done = self.transition_order(
-            order_id=order_id,
-            target_status=OrderStatus.DONE.value,
-            fields={"done_at": iso_now()},
-        )
-        return self.transition_order(
-            order_id=order_id,
-            target_status=OrderStatus.WAIT_CLIENT_CONFIRM.value,
-        )
+    def complete_order(self, order_id: str, operator_id: int, operator_username: str | None) -> dict[str, Any]:
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT status, operator_id, claimed_at FROM orders WHERE order_id = ? LIMIT 1",
+                (order_id,),
+            ).fetchone()
+            if row is None:
+                raise KeyError(f"Order not found: {order_id}")
+            if row["operator_id"] and row["operator_id"] != operator_id:
+                raise PermissionError("Order is already claimed by another operator.")
+
+            if row["status"] == OrderStatus.READY_FOR_OPERATOR.value:
+                fields: dict[str, Any] = {}
+                if not row["operator_id"]:
+                    fields["operator_id"] = operator_id
+                    fields["operator_username"] = operator_username
+                if not row["claimed_at"]:
+                    fields["claimed_at"] = iso_now()
+                self._transition_in(conn, order_id, OrderStatus.IN_PROGRESS.value, fields)
+            self._transition_in(conn, order_id, OrderStatus.DONE.value, {"done_at": iso_now()})
+            done, _ = self._transition_in(conn, order_id, OrderStatus.WAIT_CLIENT_CONFIRM.value, None)
+            conn.commit()
+            result = _row_to_dict(done)
+            assert result is not None
+            self._cache_order(dict(result))
+        return result
 
     def mark_order_error(self, order_id: str, error_code: str, error_text: str) -> dict[str, Any]:
         return self.transition_order(
@@ -504,6 +646,22 @@ class Repository:
             )
             conn.commit()
 
+    def log_admin_actions(
+        self,
+        rows: list[tuple[str, int, str | None, str, str | None, str]],
+    ) -> None:
+        if not rows:
+            return
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                """
+                INSERT INTO admin_actions(order_id, admin_id, admin_username, action, note, created_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+            conn.commit()
+
     def log_event(self, event_type: str, payload: dict[str, Any]) -> None:
         with self._lock, self._connect() as conn:
             conn.execute(
@@ -511,6 +669,23 @@ class Repository:
                 INSERT INTO events_log(event_type, payload_json, created_at)
                 VALUES (?, ?, ?)
                 """,
-                (event_type, json.dumps(payload, ensure_ascii=False), iso_now()),
+                (event_type, orjson.dumps(payload).decode("utf-8"), iso_now()),
+            )
+            conn.commit()
+
+    def log_events(self, events: list[tuple[str, dict[str, Any], str]]) -> None:
+        if not events:
+            return
+        rows = [
+            (event_type, orjson.dumps(payload).decode("utf-8"), created_at)
+            for event_type, payload, created_at in events
+        ]
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                """
+                INSERT INTO events_log(event_type, payload_json, created_at)
+                VALUES (?, ?, ?)
+                """,
+                rows,
             )
             conn.commit()
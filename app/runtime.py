@@ -6,7 +6,9 @@ from app.config import Settings, load_settings
 from app.db import init_db
 from app.products import Product, load_products
 from app.repository import Repository
+from app.services.event_log import AdminActionLogBuffer, EventLogBuffer
 from app.services.order_flow import OrderFlowService
+from app.services.outbox import Outbox
 from app.services.payment import RobokassaService
 
 
@@ -17,6 +19,9 @@ class AppContainer:
     repository: Repository
     payment_service: RobokassaService
     order_flow: OrderFlowService
+    event_log: EventLogBuffer
+    admin_log: AdminActionLogBuffer
+    outbox: Outbox
 
 
 def build_container() -> AppContainer:
@@ -32,5 +37,8 @@ def build_container() -> AppContainer:
         repository=repository,
         payment_service=payment_service,
         order_flow=flow,
+        event_log=EventLogBuffer(repository),
+        admin_log=AdminActionLogBuffer(repository),
+        outbox=Outbox(),
     )
 
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Generic, TypeVar
+
+from app.repository import Repository, iso_now
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class _BatchWriteBuffer(ABC, Generic[T]):
+    table = ""
+
+    def __init__(
+        self,
+        repository: Repository,
+        *,
+        max_pending: int = 10_000,
+        batch_size: int = 256,
+        flush_interval_seconds: float = 0.1,
+    ):
+        self.repository = repository
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self._queue: asyncio.Queue[T] = asyncio.Queue(maxsize=max_pending)
+        self.dropped = 0
+
+    def _put(self, item: T) -> None:
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self._queue.get_nowait()
+            self.dropped += 1
+            self._queue.put_nowait(item)
+
+    def _drain(self, batch: list[T]) -> None:
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                return
+
+    @abstractmethod
+    def _write_batch(self, batch: list[T]) -> None: ...
+
+    def _write(self, batch: list[T]) -> None:
+        try:
+            self._write_batch(batch)
+        except Exception:
+            logger.exception("Failed to write %s rows to %s", len(batch), self.table)
+
+    def flush_pending(self) -> int:
+        written = 0
+        while not self._queue.empty():
+            batch: list[T] = []
+            self._drain(batch)
+            self._write(batch)
+            written += len(batch)
+        return written
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            try:
+                deadline = loop.time() + self.flush_interval_seconds
+                self._drain(batch)
+                while len(batch) < self.batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+                    self._drain(batch)
+            finally:
+                await asyncio.to_thread(self._write, batch)
+
+
+EventLogRow = tuple[str, dict[str, Any], str]
+
+
+class EventLogBuffer(_BatchWriteBuffer[EventLogRow]):
+    table = "events_log"
+
+    def log_event(self, event_type: str, payload: dict[str, Any]) -> None:
+        self._put((event_type, payload, iso_now()))
+
+    def _write_batch(self, batch: list[EventLogRow]) -> None:
+        self.repository.log_events(batch)
+
+
+AdminActionRow = tuple[str, int, str | None, str, str | None, str]
+
+
+class AdminActionLogBuffer(_BatchWriteBuffer[AdminActionRow]):
+    table = "admin_actions"
+
+    def log_admin_action(
+        self,
+        order_id: str,
+        admin_id: int,
+        admin_username: str | None,
+        action: str,
+        note: str | None = None,
+    ) -> None:
+        self._put((order_id, admin_id, admin_username, action, note, iso_now()))
+
+    def _write_batch(self, batch: list[AdminActionRow]) -> None:
+        self.repository.log_admin_actions(batch)
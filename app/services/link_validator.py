@@ -1,16 +1,18 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from urllib.parse import urlparse
+from functools import lru_cache
+from typing import Collection
+from urllib.parse import urlsplit
 
 
-BLOCKED_SHORT_DOMAINS = {
+BLOCKED_SHORT_DOMAINS = frozenset({
     "bit.ly",
     "t.co",
     "tinyurl.com",
     "goo.gl",
     "vk.cc",
-}
+})
 
 
 @dataclass(slots=True)
@@ -21,64 +23,81 @@ class LinkValidationResult:
     error_text: str | None = None
 
 
-def validate_service_link(raw_text: str, allowed_domains: list[str]) -> LinkValidationResult:
+EMPTY_RESULT = LinkValidationResult(
+    is_valid=False,
+    normalized_url=None,
+    error_code="empty",
+    error_text="Пустое сообщение. Нужна ссылка.",
+)
+NOT_SINGLE_URL_RESULT = LinkValidationResult(
+    is_valid=False,
+    normalized_url=None,
+    error_code="not_single_url",
+    error_text="Нужна одна ссылка без дополнительных слов.",
+)
+SCHEME_RESULT = LinkValidationResult(
+    is_valid=False,
+    normalized_url=None,
+    error_code="scheme",
+    error_text="Ссылка должна начинаться с https://",
+)
+HOST_RESULT = LinkValidationResult(
+    is_valid=False,
+    normalized_url=None,
+    error_code="host",
+    error_text="Не удалось определить домен в ссылке.",
+)
+SHORTENER_RESULT = LinkValidationResult(
+    is_valid=False,
+    normalized_url=None,
+    error_code="shortener",
+    error_text="Сокращённые ссылки не принимаются.",
+)
+
+
+@lru_cache(maxsize=64)
+def _domain_result(allowed_domains: frozenset[str]) -> LinkValidationResult:
+    return LinkValidationResult(
+        is_valid=False,
+        normalized_url=None,
+        error_code="domain",
+        error_text=f"Ожидается домен: {', '.join(sorted(allowed_domains))}",
+    )
+
+
+def _host_in_domains(host: str, domains: Collection[str]) -> bool:
+    while True:
+        if host in domains:
+            return True
+        _, dot, host = host.partition(".")
+        if not dot:
+            return False
+
+
+def validate_service_link(raw_text: str, allowed_domains: Collection[str]) -> LinkValidationResult:
     candidate = raw_text.strip()
     if not candidate:
-        return LinkValidationResult(
-            is_valid=False,
-            normalized_url=None,
-            error_code="empty",
-            error_text="Пустое сообщение. Нужна ссылка.",
-        )
+        return EMPTY_RESULT
 
     if " " in candidate:
-        return LinkValidationResult(
-            is_valid=False,
-            normalized_url=None,
-            error_code="not_single_url",
-            error_text="Нужна одна ссылка без дополнительных слов.",
-        )
-
-    parsed = urlparse(candidate)
+        return NOT_SINGLE_URL_RESULT
+
+    parsed = urlsplit(candidate)
     if parsed.scheme.lower() != "https":
-        return LinkValidationResult(
-            is_valid=False,
-            normalized_url=None,
-            error_code="scheme",
-            error_text="Ссылка должна начинаться с https://",
-        )
-
-    host = (parsed.hostname or "").lower().strip(".")
+        return SCHEME_RESULT
+
+    host = (parsed.hostname or "").strip(".")
     if not host:
-        return LinkValidationResult(
-            is_valid=False,
-            normalized_url=None,
-            error_code="host",
-            error_text="Не удалось определить домен в ссылке.",
-        )
+        return HOST_RESULT
 
     if host in BLOCKED_SHORT_DOMAINS:
-        return LinkValidationResult(
-            is_valid=False,
-            normalized_url=None,
-            error_code="shortener",
-            error_text="Сокращённые ссылки не принимаются.",
-        )
+        return SHORTENER_RESULT
+
+    if allowed_domains and not _host_in_domains(host, allowed_domains):
+        return _domain_result(frozenset(allowed_domains))
 
     normalized = f"https://{host}{parsed.path or ''}"
     if parsed.query:
         normalized += f"?{parsed.query}"
-
-    if allowed_domains:
-        good = any(host == domain or host.endswith(f".{domain}") for domain in allowed_domains)
-        if not good:
-            domains = ", ".join(allowed_domains)
-            return LinkValidationResult(
-                is_valid=False,
-                normalized_url=None,
-                error_code="domain",
-                error_text=f"Ожидается домен: {domains}",
-            )
-
     return LinkValidationResult(is_valid=True, normalized_url=normalized)
 
@@ -5,7 +5,7 @@ from datetime import date, timedelta
 from typing import Any
 
 from app.config import Settings
-from app.enums import OrderStatus
+from app.enums import PAID_ORDER_STATUSES, OrderStatus
 from app.products import Product
 from app.repository import (
     ActiveOrderExistsError,
@@ -63,7 +63,7 @@ class OrderFlowService:
         return self.payment_service.create_payment_link(
             order_id=order["order_id"],
             inv_id=int(order["payment_inv_id"]),
-            amount_rub=int(order["price_rub"]),
+            amount_rub=order["price_rub"],
             description=f"{order['product_name']} ({order['order_id']})",
         )
 
@@ -175,7 +175,7 @@ class OrderFlowService:
         order = self.repository.get_order(order_id)
         if order is None:
             return PaymentWebhookResult(order=None, updated=False, reason="order_not_found")
-        out_sum = f"{int(order['price_rub']):.2f}"
+        out_sum = f"{order['price_rub']:.2f}"
         return self._confirm_wait_pay_order(
             order=order,
             out_sum=out_sum,
@@ -191,16 +191,7 @@ class OrderFlowService:
     ) -> PaymentWebhookResult:
         
         status = order["status"]
-        already_paid_chain = {
-            OrderStatus.PAID.value,
-            OrderStatus.WAIT_SERVICE_LINK.value,
-            OrderStatus.READY_FOR_OPERATOR.value,
-            OrderStatus.IN_PROGRESS.value,
-            OrderStatus.DONE.value,
-            OrderStatus.WAIT_CLIENT_CONFIRM.value,
-            OrderStatus.CLIENT_CONFIRMED.value,
-        }
-        if status in already_paid_chain:
+        if status in PAID_ORDER_STATUSES:
             return PaymentWebhookResult(order=order, updated=False, reason="already_processed")
 
         if status != OrderStatus.WAIT_PAY.value:
@@ -231,7 +222,7 @@ class OrderFlowService:
         start = date.today()
         end = start + timedelta(days=product.duration_days)
         self.repository.upsert_subscription(
-            tg_id=int(order["tg_id"]),
+            tg_id=order["tg_id"],
             product_code=product.code,
             start_date_iso=start.isoformat(),
             end_date_iso=end.isoformat(),
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from functools import partial
+from typing import Any, Awaitable, Callable
+
+
+logger = logging.getLogger(__name__)
+
+OutboxJob = Callable[[], Awaitable[Any]]
+
+
+class Outbox:
+    def __init__(self, *, max_pending: int = 10_000, workers: int = 4):
+        self.workers = workers
+        self._queues: list[asyncio.Queue[OutboxJob]] = [
+            asyncio.Queue(maxsize=max(1, max_pending // workers)) for _ in range(workers)
+        ]
+        self.dropped = 0
+
+    def submit(self, func: Callable[..., Awaitable[Any]], /, *args: Any, **kwargs: Any) -> None:
+        self.submit_for(kwargs.get("chat_id"), func, *args, **kwargs)
+
+    def submit_for(self, chat_id: Any, func: Callable[..., Awaitable[Any]], /, *args: Any, **kwargs: Any) -> None:
+        job = partial(func, *args, **kwargs)
+        try:
+            self._queues[hash(chat_id) % self.workers].put_nowait(job)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.error("Outbox is full, dropping %s", getattr(func, "__qualname__", func))
+
+    async def _run_job(self, job: OutboxJob) -> None:
+        try:
+            await job()
+        except Exception:
+            logger.exception("Outbox job %s failed", getattr(job, "func", job))
+
+    async def _worker(self, queue: asyncio.Queue[OutboxJob]) -> None:
+        while True:
+            job = await queue.get()
+            try:
+                await self._run_job(job)
+            finally:
+                queue.task_done()
+
+    async def run(self) -> None:
+        await asyncio.gather(*(self._worker(queue) for queue in self._queues))
+
+    async def flush_pending(self) -> int:
+        done = 0
+        for queue in self._queues:
+            while not queue.empty():
+                job = queue.get_nowait()
+                await self._run_job(job)
+                queue.task_done()
+                done += 1
+        return done
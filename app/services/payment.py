@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 import hashlib
+import hmac
 from dataclasses import dataclass
-from typing import Mapping
+from typing import Iterable, Mapping
 from urllib.parse import urlencode
 
 from app.config import Settings
@@ -24,25 +25,17 @@ class RobokassaService:
         self.hash_algo = settings.robokassa_hash_algo.lower()
         if self.hash_algo not in {"md5", "sha1", "sha256", "sha512"}:
             raise ValueError(f"Unsupported hash algorithm: {self.hash_algo}")
+        self._hash_factory = getattr(hashlib, self.hash_algo)  # md5/sha1 are provider-compatible choices
+        self._payment_password_part = f":{settings.robokassa_password1}"
+        self._result_password_part = f":{settings.robokassa_password2}"
 
     def _digest(self, payload: str) -> str:
-        encoded = payload.encode("utf-8")
-        if self.hash_algo == "md5":
-            return hashlib.md5(encoded).hexdigest()  # noqa: S324 - provider-compatible choice
-        if self.hash_algo == "sha1":
-            return hashlib.sha1(encoded).hexdigest()  # noqa: S324 - provider-compatible choice
-        if self.hash_algo == "sha256":
-            return hashlib.sha256(encoded).hexdigest()
-        return hashlib.sha512(encoded).hexdigest()
+        return self._hash_factory(payload.encode("utf-8")).hexdigest()
 
-    def _append_shp_part(self, parts: list[str], shp_fields: Mapping[str, str]) -> None:
-        for key in sorted(shp_fields.keys(), key=str.lower):
-            parts.append(f"{key}={shp_fields[key]}")
-
-    def _signature_base(self, *, out_sum: str, inv_id: str, password: str, shp_fields: Mapping[str, str]) -> str:
-        parts = [out_sum, inv_id, password]
-        self._append_shp_part(parts, shp_fields)
-        return ":".join(parts)
+    def _shp_suffix(self, shp_fields: Mapping[str, str]) -> str:
+        if not shp_fields:
+            return ""
+        return "".join(f":{key}={shp_fields[key]}" for key in sorted(shp_fields, key=str.lower))
 
     def create_payment_link(
         self,
@@ -73,14 +66,9 @@ class RobokassaService:
             )
 
         shp_fields = {"Shp_order_id": order_id}
-        base = ":".join(
-            [
-                self.settings.robokassa_merchant_login,
-                out_sum,
-                str(inv_id),
-                self.settings.robokassa_password1,
-                *[f"{key}={shp_fields[key]}" for key in sorted(shp_fields.keys(), key=str.lower)],
-            ]
+        base = (
+            f"{self.settings.robokassa_merchant_login}:{out_sum}:{inv_id}"
+            f"{self._payment_password_part}{self._shp_suffix(shp_fields)}"
         )
         signature = self._digest(base)
         query = {
@@ -105,17 +93,20 @@ class RobokassaService:
             provider_mode="robokassa",
         )
 
-    def verify_result_signature(self, params: Mapping[str, str]) -> bool:
-        out_sum = params.get("OutSum", "").strip()
-        inv_id = params.get("InvId", "").strip()
-        provided = params.get("SignatureValue", "").strip().lower()
-        shp_fields = {k: v for k, v in params.items() if k.startswith("Shp_")}
+    def verify_result_signature(self, params: Mapping[str, str] | Iterable[tuple[str, str]]) -> bool:
+        pairs = params.items() if isinstance(params, Mapping) else params
+        out_sum = inv_id = provided = ""
+        shp_fields: dict[str, str] = {}
+        for key, value in pairs:
+            if key == "OutSum":
+                out_sum = value
+            elif key == "InvId":
+                inv_id = value
+            elif key == "SignatureValue":
+                provided = value
+            elif key.startswith("Shp_"):
+                shp_fields[key] = value
 
-        base = self._signature_base(
-            out_sum=out_sum,
-            inv_id=inv_id,
-            password=self.settings.robokassa_password2,
-            shp_fields=shp_fields,
-        )
-        expected = self._digest(base).lower()
-        return expected == provided
+        base = f"{out_sum.strip()}:{inv_id.strip()}{self._result_password_part}{self._shp_suffix(shp_fields)}"
+        expected = self._digest(base)
+        return hmac.compare_digest(expected.encode("ascii"), provided.strip().lower().encode("utf-8"))
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+import hashlib
+from urllib.parse import quote
+
+from app.api import _parse_form_pairs
+from app.services.payment import RobokassaService
+
+
+def test_form_pairs_decode_non_ascii_shp_values_for_signature(settings) -> None:
+    service = RobokassaService(settings)
+    base = "2990.00:10:pass2:Shp_comment=Оплата заказа:Shp_order_id=RB-10"
+    signature = hashlib.md5(base.encode("utf-8")).hexdigest()  # noqa: S324 - compatibility test
+    fields = f"OutSum=2990.00&InvId=10&Shp_order_id=RB-10&SignatureValue={signature}&Shp_comment="
+
+    for comment in ("Оплата+заказа", quote("Оплата заказа")):
+        pairs = _parse_form_pairs((fields + comment).encode("utf-8"))
+
+        assert dict(pairs)["Shp_comment"] == "Оплата заказа"
+        assert service.verify_result_signature(pairs)
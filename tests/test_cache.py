@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from app.cache import TTLCache
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_ttl_cache_expires_entries() -> None:
+    clock = _Clock()
+    cache: TTLCache[int, str] = TTLCache(maxsize=4, ttl_seconds=10, clock=clock)
+    cache.set(1, "RB-1")
+    assert cache.get(1) == "RB-1"
+    assert 1 in cache
+
+    clock.now = 10.0
+    assert cache.get(1) is None
+    assert 1 not in cache
+
+
+def test_ttl_cache_evicts_least_recently_used() -> None:
+    cache: TTLCache[int, str] = TTLCache(maxsize=2, ttl_seconds=60)
+    cache.set(1, "a")
+    cache.set(2, "b")
+    cache.get(1)
+    cache.set(3, "c")
+
+    assert cache.get(1) == "a"
+    assert cache.get(2) is None
+    assert cache.get(3) == "c"
+    assert len(cache) == 2
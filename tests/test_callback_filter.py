@@ -0,0 +1,34 @@
+import asyncio
+
+from aiogram.types import CallbackQuery, User
+
+from app.bot.filters import CallbackPrefix
+
+
+async def _handler(callback, arg):
+    return None
+
+
+def _callback(data):
+    return CallbackQuery(
+        id="1",
+        from_user=User(id=5, is_bot=False, first_name="u"),
+        chat_instance="c",
+        data=data,
+    )
+
+
+def test_callback_prefix_passes_handler_and_arg():
+    callback_filter = CallbackPrefix({"confirm": _handler})
+
+    result = asyncio.run(callback_filter(_callback("confirm:gpt:plus")))
+
+    assert result == {"callback_handler": _handler, "callback_arg": "gpt:plus"}
+
+
+def test_callback_prefix_rejects_unknown_or_bare_data():
+    callback_filter = CallbackPrefix({"confirm": _handler})
+
+    assert asyncio.run(callback_filter(_callback("renew:gpt"))) is False
+    assert asyncio.run(callback_filter(_callback("confirm"))) is False
+    assert asyncio.run(callback_filter(_callback(None))) is False
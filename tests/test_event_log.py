@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+from app.db import init_db
+from app.repository import Repository
+from app.services.event_log import AdminActionLogBuffer, EventLogBuffer
+
+
+def _event_types(repo: Repository) -> list[str]:
+    with repo._connect() as conn:
+        rows = conn.execute("SELECT event_type FROM events_log ORDER BY id").fetchall()
+    return [row["event_type"] for row in rows]
+
+
+def test_flush_pending_writes_buffered_events(settings) -> None:
+    init_db(settings.database_path)
+    repo = Repository(settings.database_path)
+    buffer = EventLogBuffer(repo, batch_size=2)
+
+    for index in range(5):
+        buffer.log_event(f"event_{index}", {"index": index})
+    assert _event_types(repo) == []
+
+    assert buffer.flush_pending() == 5
+    assert _event_types(repo) == [f"event_{index}" for index in range(5)]
+
+
+def test_events_keep_the_time_they_were_logged(settings, monkeypatch) -> None:
+    init_db(settings.database_path)
+    repo = Repository(settings.database_path)
+    buffer = EventLogBuffer(repo)
+    stamps = iter(["2026-01-01T00:00:01+00:00", "2026-01-01T00:00:02+00:00"])
+    monkeypatch.setattr("app.services.event_log.iso_now", lambda: next(stamps))
+
+    buffer.log_event("first", {})
+    buffer.log_event("second", {})
+    buffer.flush_pending()
+
+    with repo._connect() as conn:
+        rows = conn.execute("SELECT created_at FROM events_log ORDER BY id").fetchall()
+    assert [row["created_at"] for row in rows] == ["2026-01-01T00:00:01+00:00", "2026-01-01T00:00:02+00:00"]
+
+
+def test_overflow_drops_oldest_event(settings) -> None:
+    init_db(settings.database_path)
+    repo = Repository(settings.database_path)
+    buffer = EventLogBuffer(repo, max_pending=2)
+
+    buffer.log_event("first", {})
+    buffer.log_event("second", {})
+    buffer.log_event("third", {})
+    buffer.flush_pending()
+
+    assert buffer.dropped == 1
+    assert _event_types(repo) == ["second", "third"]
+
+
+def test_run_flushes_in_background(settings) -> None:
+    init_db(settings.database_path)
+    repo = Repository(settings.database_path)
+    buffer = EventLogBuffer(repo, flush_interval_seconds=0.01)
+
+    async def scenario() -> None:
+        task = asyncio.create_task(buffer.run())
+        buffer.log_event("robokassa_result_webhook", {"inv_id": "10"})
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(scenario())
+    with repo._connect() as conn:
+        row = conn.execute("SELECT payload_json FROM events_log").fetchone()
+    assert json.loads(row["payload_json"]) == {"inv_id": "10"}
+
+
+def test_admin_action_buffer_writes_batched_rows(settings) -> None:
+    init_db(settings.database_path)
+    repo = Repository(settings.database_path)
+    buffer = AdminActionLogBuffer(repo)
+
+    buffer.log_admin_action("RB-1", 99, "admin", "CLAIM")
+    buffer.log_admin_action("RB-1", 99, None, "CLOSE_ERROR", note="reason")
+    with repo._connect() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM admin_actions").fetchone()[0] == 0
+
+    assert buffer.flush_pending() == 2
+    with repo._connect() as conn:
+        rows = conn.execute(
+            "SELECT order_id, admin_id, admin_username, action, note FROM admin_actions ORDER BY id"
+        ).fetchall()
+    assert [tuple(row) for row in rows] == [
+        ("RB-1", 99, "admin", "CLAIM", None),
+        ("RB-1", 99, None, "CLOSE_ERROR", "reason"),
+    ]
@@ -20,3 +20,15 @@ def test_non_https_is_rejected() -> None:
     assert not result.is_valid
     assert result.error_code == "scheme"
 
+
+
+def test_path_parameters_are_kept_in_normalized_url() -> None:
+    result = validate_service_link("https://Pay.OpenAI.com/c/pay;session=1?x=1", ["pay.openai.com"])
+    assert result.is_valid
+    assert result.normalized_url == "https://pay.openai.com/c/pay;session=1?x=1"
+
+
+def test_subdomain_of_allowed_domain_is_accepted() -> None:
+    allowed = frozenset({"openai.com"})
+    assert validate_service_link("https://pay.openai.com/x", allowed).is_valid
+    assert not validate_service_link("https://evilopenai.com/x", allowed).is_valid
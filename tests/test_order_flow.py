@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+import threading
 from pathlib import Path
 
 import pytest
@@ -11,6 +12,7 @@ from app.products import load_products
 from app.repository import ActiveOrderExistsError, Repository, UserHasOpenOrderError
 from app.services.order_flow import DailyOrderLimitExceededError, OrderFlowService
 from app.services.payment import RobokassaService
+from app.state_machine import TransitionError
 
 
 def _write_products(path: Path) -> None:
@@ -238,3 +240,196 @@ def test_block_and_unblock_user(settings, tmp_path: Path) -> None:
     assert repo.is_user_blocked(16)
     repo.unblock_user(16)
     assert not repo.is_user_blocked(16)
+
+
+def test_user_block_cache_fill_does_not_hide_concurrent_block(settings, tmp_path: Path) -> None:
+    init_db(settings.database_path)
+    repo = Repository(settings.database_path)
+
+    finish_user_block_fill = repo._finish_user_block_fill
+
+    def finish_fill_after_racing_block(tg_id: int, fill: object, block: object) -> None:
+        if block is None:
+            writer = threading.Thread(target=repo.block_user, kwargs={"tg_id": tg_id, "blocked_by": 9001})
+            writer.start()
+            writer.join()
+        finish_user_block_fill(tg_id, fill, block)
+
+    repo._finish_user_block_fill = finish_fill_after_racing_block
+    assert not repo.is_user_blocked(25)
+    repo._finish_user_block_fill = finish_user_block_fill
+
+    assert repo.is_user_blocked(25)
+
+
+def test_log_event_stores_json_payload(settings, tmp_path: Path) -> None:
+    init_db(settings.database_path)
+    repo = Repository(settings.database_path)
+
+    repo.log_event("robokassa_result_webhook", {"inv_id": "10", "reason": "оплачено"})
+
+    with repo._connect() as conn:
+        row = conn.execute("SELECT event_type, payload_json FROM events_log").fetchone()
+    assert row["event_type"] == "robokassa_result_webhook"
+    assert json.loads(row["payload_json"]) == {"inv_id": "10", "reason": "оплачено"}
+
+
+def test_get_order_reflects_writes_after_cached_read(settings, tmp_path: Path) -> None:
+    _write_products(Path(settings.products_file))
+    init_db(settings.database_path)
+    repo = Repository(settings.database_path)
+
+    created = repo.create_order(
+        tg_id=17,
+        username="u",
+        source_key="gpt_plus_1m",
+        product_code="gpt_plus_1m",
+        product_name="GPT Plus 1m",
+        price_rub=2990,
+        wait_pay_timeout_minutes=60,
+    )
+    order_id = created["order_id"]
+    assert repo.get_order(order_id)["status"] == OrderStatus.NEW.value
+    assert type(created["tg_id"]) is int and type(created["price_rub"]) is int
+
+    repo.transition_order(order_id, OrderStatus.WAIT_PAY.value)
+    assert repo.get_order(order_id)["status"] == OrderStatus.WAIT_PAY.value
+
+    repo.update_payment_fields(order_id, out_sum="2990.00", payment_status_text="webhook_paid")
+    reread = repo.get_order(order_id)
+    assert reread["payment_out_sum"] == "2990.00"
+
+    reread["status"] = "MUTATED"
+    assert repo.get_order(order_id)["status"] == OrderStatus.WAIT_PAY.value
+
+    updated_at = repo.get_order(order_id)["updated_at"]
+    assert repo.transition_order(order_id, OrderStatus.WAIT_PAY.value)["updated_at"] == updated_at
+
+
+def test_get_order_cache_fill_does_not_overwrite_concurrent_transition(settings, tmp_path: Path) -> None:
+    _write_products(Path(settings.products_file))
+    init_db(settings.database_path)
+    repo = Repository(settings.database_path)
+
+    order_id = repo.create_order(
+        tg_id=24,
+        username="u",
+        source_key="gpt_plus_1m",
+        product_code="gpt_plus_1m",
+        product_name="GPT Plus 1m",
+        price_rub=2990,
+        wait_pay_timeout_minutes=60,
+    )["order_id"]
+    repo._forget_order(order_id)
+
+    finish_order_fill = repo._finish_order_fill
+
+    def finish_fill_after_racing_transition(order_id: str, fill: object, order: dict | None) -> None:
+        if order is not None and order["status"] == OrderStatus.NEW.value:
+            writer = threading.Thread(target=repo.transition_order, args=(order_id, OrderStatus.WAIT_PAY.value))
+            writer.start()
+            writer.join()
+        finish_order_fill(order_id, fill, order)
+
+    repo._finish_order_fill = finish_fill_after_racing_transition
+    assert repo.get_order(order_id)["status"] == OrderStatus.NEW.value
+    repo._finish_order_fill = finish_order_fill
+
+    assert repo.get_order(order_id)["status"] == OrderStatus.WAIT_PAY.value
+
+
+def test_set_order_in_progress_claims_unassigned_order(settings, tmp_path: Path) -> None:
+    _write_products(Path(settings.products_file))
+    init_db(settings.database_path)
+    repo = Repository(settings.database_path)
+
+    order_id = repo.create_order(
+        tg_id=20,
+        username="u",
+        source_key="gpt_plus_1m",
+        product_code="gpt_plus_1m",
+        product_name="GPT Plus 1m",
+        price_rub=2990,
+        wait_pay_timeout_minutes=60,
+    )["order_id"]
+    for status in (
+        OrderStatus.WAIT_PAY,
+        OrderStatus.PAID,
+        OrderStatus.WAIT_SERVICE_LINK,
+        OrderStatus.READY_FOR_OPERATOR,
+    ):
+        repo.transition_order(order_id, status.value)
+
+    updated = repo.set_order_in_progress(order_id, 7, "op")
+    assert updated["status"] == OrderStatus.IN_PROGRESS.value
+    assert updated["operator_id"] == 7
+    assert updated["operator_username"] == "op"
+    assert updated["claimed_at"]
+    assert repo.get_order(order_id) == updated
+
+    with pytest.raises(PermissionError):
+        repo.set_order_in_progress(order_id, 8, "other")
+
+
+def test_get_order_by_payment_inv_id_follows_order_updates(settings, tmp_path: Path) -> None:
+    _write_products(Path(settings.products_file))
+    init_db(settings.database_path)
+    repo = Repository(settings.database_path)
+
+    created = repo.create_order(
+        tg_id=22,
+        username="u",
+        source_key="gpt_plus_1m",
+        product_code="gpt_plus_1m",
+        product_name="GPT Plus 1m",
+        price_rub=2990,
+        wait_pay_timeout_minutes=60,
+    )
+    inv_id = created["payment_inv_id"]
+    assert repo.get_order_by_payment_inv_id(inv_id)["status"] == OrderStatus.NEW.value
+
+    repo.transition_order(created["order_id"], OrderStatus.WAIT_PAY.value)
+    repo.update_payment_fields(created["order_id"], out_sum="2990.00", payment_status_text="webhook_paid")
+
+    order = repo.get_order_by_payment_inv_id(inv_id)
+    assert order["status"] == OrderStatus.WAIT_PAY.value
+    assert order["payment_out_sum"] == "2990.00"
+    assert repo.get_order_by_payment_inv_id(inv_id + 1000) is None
+
+
+def test_complete_order_claims_and_finishes_ready_order(settings, tmp_path: Path) -> None:
+    _write_products(Path(settings.products_file))
+    init_db(settings.database_path)
+    repo = Repository(settings.database_path)
+
+    order_id = repo.create_order(
+        tg_id=23,
+        username="u",
+        source_key="gpt_plus_1m",
+        product_code="gpt_plus_1m",
+        product_name="GPT Plus 1m",
+        price_rub=2990,
+        wait_pay_timeout_minutes=60,
+    )["order_id"]
+    for status in (
+        OrderStatus.WAIT_PAY,
+        OrderStatus.PAID,
+        OrderStatus.WAIT_SERVICE_LINK,
+        OrderStatus.READY_FOR_OPERATOR,
+    ):
+        repo.transition_order(order_id, status.value)
+    repo.claim_order(order_id, 7, "op")
+
+    with pytest.raises(PermissionError):
+        repo.complete_order(order_id, 8, "other")
+    assert repo.get_order(order_id)["status"] == OrderStatus.READY_FOR_OPERATOR.value
+
+    done = repo.complete_order(order_id, 7, "op")
+    assert done["status"] == OrderStatus.WAIT_CLIENT_CONFIRM.value
+    assert done["operator_id"] == 7
+    assert done["claimed_at"]
+    assert done["done_at"]
+    assert repo.get_order(order_id) == done
+
+    with pytest.raises(TransitionError):
+        repo.complete_order(order_id, 7, "op")
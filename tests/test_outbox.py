@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import asyncio
+
+from app.services.outbox import Outbox
+
+
+def test_run_executes_jobs_and_survives_failures() -> None:
+    outbox = Outbox(workers=2)
+    sent: list[tuple[int, str]] = []
+
+    async def send_message(*, chat_id: int, text: str) -> None:
+        if text == "boom":
+            raise RuntimeError(text)
+        sent.append((chat_id, text))
+
+    async def scenario() -> None:
+        task = asyncio.create_task(outbox.run())
+        outbox.submit(send_message, chat_id=1, text="boom")
+        outbox.submit(send_message, chat_id=1, text="first")
+        outbox.submit(send_message, chat_id=2, text="second")
+        await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(scenario())
+    assert sorted(sent) == [(1, "first"), (2, "second")]
+
+
+def test_full_outbox_drops_and_flush_runs_pending() -> None:
+    outbox = Outbox(max_pending=1)
+    sent: list[str] = []
+
+    async def send(text: str) -> None:
+        sent.append(text)
+
+    outbox.submit(send, "kept")
+    outbox.submit(send, "dropped")
+
+    assert outbox.dropped == 1
+    assert asyncio.run(outbox.flush_pending()) == 1
+    assert sent == ["kept"]
+
+
+def test_jobs_for_one_chat_run_in_submission_order() -> None:
+    outbox = Outbox(workers=4)
+    sent: list[tuple[int, str]] = []
+
+    async def send_message(*, chat_id: int, text: str) -> None:
+        await asyncio.sleep(0.01 if text == "accepted" else 0)
+        sent.append((chat_id, text))
+
+    async def notify(chat_id: int, text: str) -> None:
+        sent.append((chat_id, text))
+
+    async def scenario() -> None:
+        task = asyncio.create_task(outbox.run())
+        outbox.submit(send_message, chat_id=1, text="accepted")
+        outbox.submit(send_message, chat_id=1, text="follow-up")
+        outbox.submit_for(1, notify, 1, "paid")
+        outbox.submit(send_message, chat_id=2, text="other")
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(scenario())
+    assert [text for chat_id, text in sent if chat_id == 1] == ["accepted", "follow-up", "paid"]
+    assert (2, "other") in sent
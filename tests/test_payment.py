@@ -92,3 +92,59 @@ def test_create_payment_link_manual_mode() -> None:
     assert link.provider_mode == "manual"
     assert link.pay_url == ""
     assert link.out_sum == "1500.00"
+
+
+def test_verify_result_signature_accepts_uppercase_sha256() -> None:
+    settings = _settings(test_mode=False)
+    settings.robokassa_hash_algo = "sha256"
+    service = RobokassaService(settings)
+    base = "2990.00:10:pass2:Shp_order_id=RB-10"
+    payload = {
+        "OutSum": "2990.00",
+        "InvId": "10",
+        "Shp_order_id": "RB-10",
+        "SignatureValue": hashlib.sha256(base.encode("utf-8")).hexdigest().upper(),
+    }
+    assert service.verify_result_signature(payload)
+
+
+def test_verify_result_signature_accepts_form_pairs() -> None:
+    service = RobokassaService(_settings(test_mode=False))
+    base = "2990.00:10:pass2:Shp_order_id=RB-10"
+    pairs = [
+        ("OutSum", "2990.00"),
+        ("InvId", "10"),
+        ("Shp_order_id", "RB-10"),
+        ("SignatureValue", hashlib.md5(base.encode("utf-8")).hexdigest()),  # noqa: S324 - compatibility test
+    ]
+    assert service.verify_result_signature(pairs)
+
+
+def test_create_payment_link_signs_merchant_fields() -> None:
+    service = RobokassaService(_settings(test_mode=False))
+    link = service.create_payment_link(
+        order_id="RB-3",
+        inv_id=12,
+        amount_rub=990,
+        description="live",
+    )
+    base = "merchant:990.00:12:pass1:Shp_order_id=RB-3"
+    expected = hashlib.md5(base.encode("utf-8")).hexdigest()  # noqa: S324 - compatibility test
+    assert link.provider_mode == "robokassa"
+    assert f"SignatureValue={expected}" in link.pay_url
+
+
+
+def test_verify_result_signature_orders_shp_fields_and_ignores_extras() -> None:
+    service = RobokassaService(_settings(test_mode=False))
+    base = "2990.00:10:pass2:Shp_Lang=ru:Shp_order_id=RB-10"
+    pairs = [
+        ("Shp_order_id", "RB-10"),
+        ("Culture", "ru"),
+        ("InvId", "10"),
+        ("OutSum", "2990.00"),
+        ("IsTest", "1"),
+        ("Shp_Lang", "ru"),
+        ("SignatureValue", hashlib.md5(base.encode("utf-8")).hexdigest()),  # noqa: S324 - compatibility test
+    ]
+    assert service.verify_result_signature(pairs)
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import GetMe, SendMessage
+
+from app.bot.rate_limit import (
+    GROUP_CHAT_BURST,
+    GROUP_CHAT_RATE_PER_SECOND,
+    PRIVATE_CHAT_BURST,
+    OutgoingRateLimitMiddleware,
+    TokenBucket,
+)
+
+
+def test_token_bucket_allows_burst_then_spaces_requests() -> None:
+    now = [0.0]
+    bucket = TokenBucket(rate=1.0, burst=3, clock=lambda: now[0])
+
+    assert [bucket.reserve() for _ in range(5)] == [0.0, 0.0, 0.0, 1.0, 2.0]
+    now[0] = 10.0
+    assert bucket.reserve() == 0.0
+
+
+def test_token_bucket_gives_each_request_its_own_slot_under_sustained_overload() -> None:
+    now = [0.0]
+    bucket = TokenBucket(rate=GROUP_CHAT_RATE_PER_SECOND, burst=GROUP_CHAT_BURST, clock=lambda: now[0])
+
+    delays = [bucket.reserve() for _ in range(30)]
+
+    assert delays[:GROUP_CHAT_BURST] == [0.0] * GROUP_CHAT_BURST
+    queued = delays[GROUP_CHAT_BURST:]
+    assert all(earlier < later for earlier, later in zip(queued, queued[1:]))
+    assert queued == pytest.approx([slot / GROUP_CHAT_RATE_PER_SECOND for slot in range(1, len(queued) + 1)])
+    assert bucket.saturated == 30 - 2 * GROUP_CHAT_BURST
+
+
+def test_middleware_retries_once_after_retry_after() -> None:
+    middleware = OutgoingRateLimitMiddleware()
+    method = SendMessage(chat_id=5, text="hi")
+    calls: list[object] = []
+
+    async def make_request(bot, request):
+        calls.append(request)
+        if len(calls) == 1:
+            raise TelegramRetryAfter(method=request, message="flood", retry_after=0)
+        return "ok"
+
+    assert asyncio.run(middleware(make_request, None, method)) == "ok"
+    assert calls == [method, method]
+    assert middleware._chats.get(5)._tokens == pytest.approx(PRIVATE_CHAT_BURST - 2, abs=0.1)
+
+
+def test_middleware_passes_through_methods_without_chat() -> None:
+    middleware = OutgoingRateLimitMiddleware()
+
+    async def make_request(bot, request):
+        return "me"
+
+    assert asyncio.run(middleware(make_request, None, GetMe())) == "me"